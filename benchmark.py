@@ -0,0 +1,171 @@
+import os
+import gzip
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import extract_v4
+from synthetic_pubmed import generate_file
+
+# Benchmark suite for the extract_v4 hot path on synthetic PubMed data.
+# Every bench_* function takes the prepared context and returns the number of items it processed.
+
+
+def bench_parse(ctx):
+    with gzip.open(ctx["file"], "rt", encoding="utf-8") as f:
+        return sum(1 for _ in extract_v4.parse_articles(f))
+
+
+def bench_split(ctx):
+    return sum(len(extract_v4.splitter.split(text)) for _, text in ctx["articles"])
+
+
+def bench_match(ctx):
+    for sent in ctx["sentences"]:
+        extract_v4.match_proteins(extract_v4.normalize_with_offsets(sent)[0])
+    return len(ctx["sentences"])
+
+
+def bench_write(ctx):
+    extract_v4.save_matches(ctx["matches"], "bench.xml.gz", output_folder=ctx["output_folder"])
+    return len(ctx["matches"])
+
+
+def bench_end_to_end(ctx):
+    matches = []
+    with gzip.open(ctx["file"], "rt", encoding="utf-8") as f:
+        for pubmed_id, abstract_text in extract_v4.parse_articles(f):
+            match = extract_v4.match_abstract(pubmed_id, abstract_text)
+            if match:
+                matches.append(match)
+    if matches:
+        extract_v4.save_matches(matches, "bench.xml.gz", output_folder=ctx["output_folder"])
+    return len(ctx["articles"])
+
+
+BENCHMARKS = {
+    "parse": bench_parse,
+    "split": bench_split,
+    "match": bench_match,
+    "write": bench_write,
+    "end_to_end": bench_end_to_end,
+}
+
+
+def prepare(work_dir, args):
+    path = generate_file(os.path.join(work_dir, "bench.xml.gz"), args.articles, args.eng_ratio,
+                         args.sentences, args.words, args.synonym_density, seed=args.seed)
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        articles = list(extract_v4.parse_articles(f))
+    sentences = [s for _, text in articles for s in extract_v4.splitter.split(text)]
+    matches = [m for m in (extract_v4.match_abstract(pmid, text) for pmid, text in articles) if m]
+    return {
+        "file": path,
+        "articles": articles,
+        "sentences": sentences,
+        "matches": matches,
+        "output_folder": os.path.join(work_dir, "out"),
+    }
+
+
+def run_benchmark(func, ctx, repeat):
+    timings = []
+    items = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = func(ctx)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {
+        "items": items,
+        "min": best,
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "items_per_sec": items / best if best > 0 else None,
+        "timings": timings,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = []
+    print(f"\nComparison against {baseline_path} ({baseline.get('label')}):")
+    for name, res in results["benchmarks"].items():
+        old = baseline.get("benchmarks", {}).get(name)
+        if not old:
+            continue
+        ratio = res["min"] / old["min"] if old["min"] > 0 else float("inf")
+        flag = "⚠️ regression" if ratio > 1 + threshold else ""
+        print(f"  {name:<12} {old['min']:.4f}s -> {res['min']:.4f}s  x{ratio:.2f} {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the extract_v4 pipeline stages")
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--eng-ratio", type=float, default=0.85)
+    parser.add_argument("--sentences", type=int, default=8)
+    parser.add_argument("--words", type=int, default=20)
+    parser.add_argument("--synonym-density", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--bench", nargs="*", choices=sorted(BENCHMARKS), help="subset of benchmarks to run")
+    parser.add_argument("--label", default=None, help="name stored with the results (default: git revision)")
+    parser.add_argument("--output", default=None, help="JSON results file (default: bench_results/<label>.json)")
+    parser.add_argument("--compare", default=None, help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown ratio reported as regression")
+    args = parser.parse_args()
+
+    revision = git_revision()
+    label = args.label or revision or "unlabelled"
+    output = args.output or os.path.join("bench_results", f"{label}.json")
+
+    work_dir = tempfile.mkdtemp(prefix="pubmed_bench_")
+    try:
+        ctx = prepare(work_dir, args)
+        print(f"Synthetic file: {len(ctx['articles'])} English abstracts, "
+              f"{len(ctx['sentences'])} sentences, {len(ctx['matches'])} matching abstracts")
+
+        results = {
+            "label": label,
+            "git_revision": revision,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "label")},
+            "benchmarks": {},
+        }
+        for name in args.bench or BENCHMARKS:
+            res = run_benchmark(BENCHMARKS[name], ctx, args.repeat)
+            results["benchmarks"][name] = res
+            print(f"  {name:<12} min {res['min']:.4f}s  median {res['median']:.4f}s  "
+                  f"{res['items_per_sec']:.0f} items/s")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            raise SystemExit(f"Regressions in: {', '.join(regressions)}")
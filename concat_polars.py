@@ -1,5 +1,6 @@
 import os
 import polars
+from panel import load_panel
 
 result_folder = "Result-v4"
 output_file = os.path.join(result_folder, "all_results_concatenated.csv")
@@ -7,5 +8,17 @@ output_file = os.path.join(result_folder, "all_results_concatenated.csv")
 # Collect all CSV files
 csv_files = [os.path.join(result_folder, f) for f in os.listdir(result_folder) if f.endswith("_2prot_sentences.csv")]
 
-lf = polars.scan_csv(csv_files)
+# extract_v4 writes panel codes ("3;17"), turn them back into protein names
+panel = load_panel()
+code_to_name = {str(i): name for i, name in enumerate(panel.names)}
+
+lf = polars.scan_csv(csv_files, schema_overrides={"Protein_Codes": polars.Utf8})
+lf = lf.with_columns(
+    polars.col("Protein_Codes")
+    .str.split(";")
+    .list.eval(polars.element().replace_strict(code_to_name))
+    .list.sort()
+    .list.join("; ")
+    .alias("Matched_Proteins")
+).select(["PubMedID", "Matched_Proteins", polars.exclude(["PubMedID", "Matched_Proteins", "Protein_Codes"])])
 lf.sink_csv(output_file)
@@ -1,5 +1,6 @@
 import os
 import pandas as pd
+from progress import Progress
 
 result_folder = "Result-v3"
 output_file = os.path.join(result_folder, "all_results_concatenated.csv")
@@ -13,14 +14,21 @@ else:
     print(f"Found {len(csv_files)} CSV files. Concatenating...")
 
     # Load all CSVs into DataFrames
+    progress = Progress("concatenation", total_items=len(csv_files),
+                        total_bytes=sum(os.path.getsize(file) for file in csv_files)).start()
+    report = progress.local_reporter()
     dfs = []
     for file in csv_files:
+        report.begin(os.path.basename(file))
         try:
             df = pd.read_csv(file)
             dfs.append(df)
+            report.add(articles=len(df))
             print(f"Loaded {os.path.basename(file)} ({len(df)} rows)")
         except Exception as e:
             print(f"Error reading {file}: {e}")
+        report.end(bytes=os.path.getsize(file))
+    progress.close()
 
     # Concatenate them into one DataFrame
     if dfs:
@@ -41,6 +41,11 @@ df = df.with_columns([
 essential_cols = ["PubMedID", "Relevant_Sentences"]
 df = df.drop_nulls(subset=essential_cols)
 
+# Offsets written by extract_v4 point into the sentences as extracted, keep a copy to detect edits
+offset_cols = [col for col in ["Normalized_Sentences", "Sentence_Offsets"] if col in df.columns]
+if offset_cols:
+    df = df.with_columns(pl.col("Relevant_Sentences").alias("_Extracted_Sentences"))
+
 # Normalize spacing and punctuation in "Relevant_Sentences"
 df = df.with_columns(
     pl.col("Relevant_Sentences")
@@ -66,6 +71,15 @@ df = df.with_columns(
     .alias("Relevant_Sentences")
 )
 
+# extract_v4 already stores cleaned sentences, older results may still have been modified above
+if offset_cols:
+    changed = pl.col("Relevant_Sentences") != pl.col("_Extracted_Sentences")
+    print(f"Rows with invalidated normalized text/offsets: {df.filter(changed).height}")
+    df = df.with_columns([
+        pl.when(changed).then(None).otherwise(pl.col(col)).alias(col)
+        for col in offset_cols
+    ]).drop("_Extracted_Sentences")
+
 # Remove duplicate rows (exact duplicates)
 df = df.unique(subset=["PubMedID", "Matched_Proteins", "Relevant_Sentences"])
 
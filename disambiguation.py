@@ -0,0 +1,211 @@
+import os
+import re
+import argparse
+import polars as pl
+from panel import load_panel
+from text_normalization import normalize_text
+
+# Drop sentence-level protein hits that rest only on short, ambiguous aliases ("SF", "TNF", "IGIF")
+# when the surrounding words do not look like the contexts where the protein is named unambiguously.
+
+input_file = "sentences.csv"
+output_file = "sentences_disambiguated.csv"
+DROPPED_FILE = "disambiguation_dropped.csv"
+WEIGHTS_FILE = "context_weights.parquet"
+
+MAX_AMBIGUOUS_LEN = 4   # normalized aliases up to this length without digits are ambiguous
+MIN_SUPPORT = 20        # unambiguous sentences needed before a protein's hits are judged
+MIN_TOKEN_COUNT = 3     # rarer context words are not scored
+SMOOTHING = 0.5
+THRESHOLD = 0.0         # mean log-likelihood ratio a hit needs to be kept
+TOKEN_PATTERN = r"[a-z][a-z0-9]{2,}"
+
+
+def is_ambiguous(syn):
+    return len(syn) <= MAX_AMBIGUOUS_LEN and not any(ch.isdigit() for ch in syn)
+
+
+def load_synonyms():
+    # Protein -> (unambiguous normalized synonyms, ambiguous normalized synonyms)
+    panel = load_panel()
+    synonyms = {}
+    for name, normalized in zip(panel.names, panel.normalized_synonyms):
+        ambiguous = [s for s in normalized if is_ambiguous(s)]
+        synonyms[name] = ([s for s in normalized if not is_ambiguous(s)], ambiguous)
+    return synonyms
+
+
+def synonym_tokens():
+    # Words that are part of any synonym say nothing about the context and are not scored
+    panel = load_panel()
+    text = " ".join(" ".join([name] + syns) for name, syns in zip(panel.names, panel.synonyms)).lower()
+    return sorted(set(re.findall(TOKEN_PATTERN, text)))
+
+
+def alternation(syns):
+    return r"\b(?:" + "|".join(re.escape(s) for s in syns) + r")\b"
+
+
+def protein_hits(df, synonyms):
+    # One row per (sentence, protein), Confident when an unambiguous synonym is present
+    hits = []
+    for protein, (specific, ambiguous) in synonyms.items():
+        norm = pl.col("Normalized_Sentence")
+        confident = norm.str.contains(alternation(specific)) if specific else pl.lit(False)
+        weak = norm.str.contains(alternation(ambiguous)) if ambiguous else pl.lit(False)
+        hits.append(
+            df.select([
+                "Sentence_ID",
+                pl.lit(protein).alias("Protein"),
+                confident.alias("Confident"),
+                weak.alias("Weak"),
+            ]).filter(pl.col("Confident") | pl.col("Weak"))
+        )
+    return pl.concat(hits).select(["Sentence_ID", "Protein", "Confident"])
+
+
+def sentence_tokens(df, stop_tokens):
+    return (
+        df.select([
+            "Sentence_ID",
+            pl.col("Relevant_Sentence").str.to_lowercase().str.extract_all(TOKEN_PATTERN).alias("Token"),
+        ])
+        .explode("Token")
+        .drop_nulls("Token")
+        .filter(~pl.col("Token").is_in(stop_tokens))
+    )
+
+
+def build_weights(tokens, hits):
+    # Log ratio of the smoothed probability of each word in a protein's unambiguous contexts
+    # versus all sentences, for every (protein, word) pair, so scoring is a single join
+    background = (
+        tokens.group_by("Token").agg(pl.len().alias("Total"))
+        .filter(pl.col("Total") >= MIN_TOKEN_COUNT)
+    )
+    vocab = background.height
+    n_total = background["Total"].sum()
+
+    confident = hits.filter(pl.col("Confident")).select(["Sentence_ID", "Protein"])
+    support = (
+        confident.group_by("Protein").agg(pl.len().alias("Support"))
+        .filter(pl.col("Support") >= MIN_SUPPORT)
+    )
+    counts = (
+        confident.join(tokens, on="Sentence_ID")
+        .join(background.select("Token"), on="Token")
+        .group_by(["Protein", "Token"]).agg(pl.len().alias("Count"))
+    )
+    sizes = counts.group_by("Protein").agg(pl.col("Count").sum().alias("Protein_Total"))
+
+    return (
+        support.join(sizes, on="Protein")
+        .join(background, how="cross")
+        .join(counts, on=["Protein", "Token"], how="left")
+        .with_columns(
+            (
+                ((pl.col("Count").fill_null(0) + SMOOTHING) / (pl.col("Protein_Total") + SMOOTHING * vocab)).log()
+                - ((pl.col("Total") + SMOOTHING) / (n_total + SMOOTHING * vocab)).log()
+            ).cast(pl.Float32).alias("Weight")
+        )
+        .select(["Protein", "Token", "Weight"])
+    )
+
+
+def weights_key(path):
+    # The weights only hold for the sentences and constants they were built from, like
+    # reference_data.cache_path the key is the input's path, size and mtime
+    stat = os.stat(path)
+    return "|".join(str(v) for v in [
+        os.path.abspath(path), stat.st_size, stat.st_mtime_ns,
+        MIN_SUPPORT, MIN_TOKEN_COUNT, SMOOTHING, TOKEN_PATTERN,
+    ])
+
+
+def load_weights(path, key):
+    # None when the file is missing or was built from another input
+    if not os.path.exists(path):
+        return None
+    try:
+        if pl.read_parquet_metadata(path).get("source_key") != key:
+            return None
+        return pl.read_parquet(path)
+    except Exception:
+        return None
+
+
+def score_hits(hits, tokens, weights):
+    # Mean context weight of every ambiguous-only hit for a protein with a profile
+    judged = weights.select("Protein").unique()
+    ambiguous = hits.filter(~pl.col("Confident")).join(judged, on="Protein")
+    return (
+        ambiguous.join(tokens, on="Sentence_ID")
+        .join(weights, on=["Protein", "Token"])
+        .group_by(["Sentence_ID", "Protein"])
+        .agg(pl.col("Weight").mean().alias("Score"))
+        .join(ambiguous.select(["Sentence_ID", "Protein"]), on=["Sentence_ID", "Protein"], how="right")
+        .with_columns(pl.col("Score").fill_null(0.0))
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drop low-confidence ambiguous synonym hits")
+    parser.add_argument("--input", default=input_file)
+    parser.add_argument("--output", default=output_file)
+    parser.add_argument("--weights", default=WEIGHTS_FILE, help="context weights, rebuilt when the input changes")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the context weights")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    df = pl.read_csv(args.input).with_row_index("Sentence_ID")
+    if "Normalized_Sentence" not in df.columns:
+        df = df.with_columns(pl.lit(None, dtype=pl.Utf8).alias("Normalized_Sentence"))
+    # Rows from older runs (or invalidated by data_cleaning) are normalized here
+    missing = df.filter(pl.col("Normalized_Sentence").is_null())
+    if missing.height:
+        df = pl.concat([
+            df.filter(pl.col("Normalized_Sentence").is_not_null()),
+            missing.with_columns(
+                pl.col("Relevant_Sentence").map_elements(normalize_text, return_dtype=pl.Utf8)
+                .alias("Normalized_Sentence")
+            ),
+        ]).sort("Sentence_ID")
+
+    synonyms = load_synonyms()
+    hits = protein_hits(df, synonyms)
+    tokens = sentence_tokens(df, synonym_tokens())
+
+    key = weights_key(args.input)
+    weights = None if args.rebuild else load_weights(args.weights, key)
+    if weights is None:
+        if os.path.exists(args.weights) and not args.rebuild:
+            print(f"⚠️ {args.weights} was built from a different input, rebuilding")
+        weights = build_weights(tokens, hits)
+        weights.write_parquet(args.weights, metadata={"source_key": key})
+        print(f"Built context weights for {weights['Protein'].n_unique()} proteins -> {args.weights}")
+    else:
+        print(f"Reusing context weights from {args.weights}")
+
+    scores = score_hits(hits, tokens, weights)
+    dropped = scores.filter(pl.col("Score") < args.threshold)
+
+    kept = (
+        hits.join(dropped.select(["Sentence_ID", "Protein"]), on=["Sentence_ID", "Protein"], how="anti")
+        .group_by("Sentence_ID")
+        .agg(pl.col("Protein").sort().str.join("; ").alias("Sentence_Proteins"), pl.len().alias("N"))
+        .filter(pl.col("N") >= 2)
+        .drop("N")
+    )
+    result = df.join(kept, on="Sentence_ID").sort("Sentence_ID").drop("Sentence_ID")
+    result.write_csv(args.output)
+
+    (
+        dropped.join(df.select(["Sentence_ID", "PubMedID", "Relevant_Sentence"]), on="Sentence_ID")
+        .sort("Score")
+        .select(["PubMedID", "Protein", "Score", "Relevant_Sentence"])
+        .write_csv(DROPPED_FILE)
+    )
+
+    print(f"Ambiguous-only hits scored: {scores.height}, dropped: {dropped.height}")
+    print(f"Sentences kept: {result.height} of {df.height} ({df.height - result.height} removed)")
+    print(f"Saved to '{args.output}', dropped hits listed in '{DROPPED_FILE}'")
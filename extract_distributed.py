@@ -0,0 +1,297 @@
+import os
+import sys
+import gzip
+import time
+import shutil
+import socket
+import sqlite3
+import argparse
+import threading
+import subprocess
+from extract_v4 import match_stream, save_matches
+
+# Coordinator/worker mode for extract_v4. The files to process are tasks in a SQLite database on the
+# shared Data/ folder; any number of workers on any host that mounts it claim a task under a lease,
+# keep the lease alive while they work and commit the output only while they still hold it.
+# A worker that dies stops renewing its lease, and its task is handed out again once the lease expires.
+#
+# Exactly-once output: results are written to a staging folder first, then moved into Result-v4 with
+# os.replace inside the same write transaction that checks the lease and marks the task done. A task
+# is only done if its output is in place, and a worker that lost its lease never publishes. Output
+# names are deterministic, so a retry after a crash between the move and the commit replaces the
+# file with identical content instead of adding a second one. A worker removes its staging folder
+# when it exits; enqueue sweeps the folders of workers that died with a result still staged.
+#
+#   python extract_distributed.py enqueue             # coordinator: register Data/*.gz
+#   python extract_distributed.py work                # on every host, as many as it has cores
+#   python extract_distributed.py status
+#   python extract_distributed.py local --workers 4   # enqueue and run workers on this machine
+
+data_folder = "Data"
+QUEUE_FILE = os.path.join(data_folder, "work_queue.sqlite")
+output_folder = "Result-v4"
+STAGING_FOLDER = os.path.join(output_folder, ".staging")
+
+LEASE_S = 120           # a task is handed out again this long after its last heartbeat
+HEARTBEAT_S = 30
+MAX_ATTEMPTS = 3        # claims per task before it is marked failed
+IDLE_POLL_S = 5         # wait between claims while other workers still hold leases
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    path        TEXT PRIMARY KEY,
+    state       TEXT NOT NULL DEFAULT 'pending',  -- pending | leased | done | failed
+    owner       TEXT,
+    lease_until REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    matches     INTEGER,
+    output      TEXT,
+    error       TEXT,
+    updated     REAL
+)
+"""
+
+
+def connect(queue_file=QUEUE_FILE):
+    # Autocommit mode with explicit BEGIN IMMEDIATE, so every claim/commit holds the write lock.
+    # The default rollback journal is kept: WAL needs shared memory and does not work across hosts.
+    conn = sqlite3.connect(queue_file, timeout=60, isolation_level=None)
+    conn.execute(SCHEMA)
+    return conn
+
+
+class transaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def staging_dir(worker_id):
+    return os.path.join(STAGING_FOLDER, worker_id.replace(":", "_"))
+
+
+def sweep_staging(conn, lease_s=LEASE_S):
+    # Staging folders left by dead workers. A folder stays while its worker holds a lease, or while
+    # anything in it changed within the last lease period (a worker that lost its lease may still
+    # be writing a result it is about to discard)
+    if not os.path.isdir(STAGING_FOLDER):
+        return 0
+    live = {staging_dir(owner) for (owner,) in conn.execute("SELECT owner FROM tasks WHERE state = 'leased'")}
+    cutoff = time.time() - lease_s
+    removed = 0
+    for name in os.listdir(STAGING_FOLDER):
+        path = os.path.join(STAGING_FOLDER, name)
+        if path in live:
+            continue
+        is_dir = os.path.isdir(path)
+        try:
+            entries = [path] + ([os.path.join(path, f) for f in os.listdir(path)] if is_dir else [])
+            if max(os.path.getmtime(e) for e in entries) > cutoff:
+                continue
+            if is_dir:
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except FileNotFoundError:
+            continue
+        removed += 1
+    return removed
+
+
+def enqueue(conn, paths, retry_failed=False, lease_s=LEASE_S):
+    with transaction(conn):
+        before = conn.total_changes
+        conn.executemany("INSERT OR IGNORE INTO tasks (path, updated) VALUES (?, ?)",
+                         [(p, time.time()) for p in paths])
+        added = conn.total_changes - before
+        if retry_failed:
+            conn.execute("UPDATE tasks SET state = 'pending', attempts = 0, error = NULL WHERE state = 'failed'")
+    swept = sweep_staging(conn, lease_s)
+    if swept:
+        print(f"Removed {swept} stale entries from {STAGING_FOLDER}")
+    return added
+
+
+def claim(conn, worker_id, lease_s=LEASE_S):
+    # Next pending task, or one whose lease ran out; None once nothing is claimable
+    now = time.time()
+    with transaction(conn):
+        conn.execute(
+            "UPDATE tasks SET state = 'failed', owner = NULL, error = 'lease expired after max attempts', updated = ? "
+            "WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+            (now, now, MAX_ATTEMPTS),
+        )
+        row = conn.execute(
+            "SELECT path FROM tasks WHERE state = 'pending' OR (state = 'leased' AND lease_until < ?) "
+            "ORDER BY attempts, path LIMIT 1",
+            (now,),
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE tasks SET state = 'leased', owner = ?, lease_until = ?, attempts = attempts + 1, updated = ? "
+            "WHERE path = ?",
+            (worker_id, now + lease_s, now, row[0]),
+        )
+    return row[0]
+
+
+def renew(conn, path, worker_id, lease_s=LEASE_S):
+    # False when the lease was lost (expired and claimed by another worker)
+    with transaction(conn):
+        cur = conn.execute(
+            "UPDATE tasks SET lease_until = ? WHERE path = ? AND owner = ? AND state = 'leased'",
+            (time.time() + lease_s, path, worker_id),
+        )
+    return cur.rowcount == 1
+
+
+def finish(conn, path, worker_id, state, matches=None, staged=None, output=None, error=None):
+    # Publish the staged output and close the task atomically, only while the lease is held
+    with transaction(conn):
+        owned = conn.execute(
+            "SELECT 1 FROM tasks WHERE path = ? AND owner = ? AND state = 'leased'", (path, worker_id)
+        ).fetchone()
+        if not owned:
+            if staged and os.path.exists(staged):
+                os.remove(staged)
+            return False
+        if staged:
+            os.replace(staged, os.path.join(output_folder, output))
+        conn.execute(
+            "UPDATE tasks SET state = ?, owner = NULL, matches = ?, output = ?, error = ?, updated = ? WHERE path = ?",
+            (state, matches, output, error, time.time(), path),
+        )
+    return True
+
+
+def release(conn, path, worker_id, error):
+    # Give a task back after a transient error; it fails for good after MAX_ATTEMPTS
+    with transaction(conn):
+        conn.execute(
+            "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "owner = NULL, error = ?, updated = ? WHERE path = ? AND owner = ? AND state = 'leased'",
+            (MAX_ATTEMPTS, error, time.time(), path, worker_id),
+        )
+
+
+def heartbeat(queue_file, path, worker_id, done, lost, lease_s):
+    # Own connection: sqlite3 connections are not shared across threads
+    conn = connect(queue_file)
+    while not done.wait(min(HEARTBEAT_S, lease_s / 3)):
+        if not renew(conn, path, worker_id, lease_s):
+            lost.set()
+            break
+    conn.close()
+
+
+def process_task(conn, queue_file, path, worker_id, lease_s):
+    filename = os.path.basename(path)
+    done, lost = threading.Event(), threading.Event()
+    beat = threading.Thread(target=heartbeat, args=(queue_file, path, worker_id, done, lost, lease_s), daemon=True)
+    beat.start()
+    try:
+        with gzip.open(path, "rb") as f:
+            matches = match_stream(f, filename)
+    except Exception as e:
+        print(f"⚠️ Error reading {filename}: {e}")
+        release(conn, path, worker_id, repr(e))
+        return
+    finally:
+        done.set()
+        beat.join()
+
+    if lost.is_set():
+        print(f"⚠️ {filename}: lease lost, result discarded")
+        return
+    if matches is None:
+        # Parse errors are deterministic, a retry would fail the same way
+        finish(conn, path, worker_id, "failed", error="XML parse error")
+        return
+    if not matches:
+        finish(conn, path, worker_id, "done", matches=0)
+        return
+
+    staging = staging_dir(worker_id)
+    output_filename = save_matches(matches, filename, output_folder=staging)
+    staged = os.path.join(staging, output_filename)
+    if finish(conn, path, worker_id, "done", len(matches), staged, output_filename):
+        print(f"✅ {filename}: {len(matches)} abstracts saved to {output_filename}")
+    else:
+        print(f"⚠️ {filename}: lease lost before commit, result discarded")
+
+
+def work(queue_file=QUEUE_FILE, lease_s=LEASE_S):
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    conn = connect(queue_file)
+    processed = 0
+    try:
+        while True:
+            path = claim(conn, worker_id, lease_s)
+            if path is None:
+                # Leases held by others may still expire and need a worker
+                active = conn.execute("SELECT COUNT(*) FROM tasks WHERE state IN ('pending', 'leased')").fetchone()[0]
+                if not active:
+                    break
+                time.sleep(IDLE_POLL_S)
+                continue
+            process_task(conn, queue_file, path, worker_id, lease_s)
+            processed += 1
+    finally:
+        # Anything still staged was never committed and never will be
+        shutil.rmtree(staging_dir(worker_id), ignore_errors=True)
+        conn.close()
+    print(f"✅ Worker {worker_id} finished after {processed} tasks")
+
+
+def status(conn):
+    rows = conn.execute(
+        "SELECT state, COUNT(*), COALESCE(SUM(matches), 0) FROM tasks GROUP BY state ORDER BY state"
+    ).fetchall()
+    for state, n, matches in rows:
+        print(f"{state:>8}: {n} files, {matches} abstracts")
+    for path, error in conn.execute("SELECT path, error FROM tasks WHERE state = 'failed'"):
+        print(f"  failed: {path} ({error})")
+
+
+def list_inputs(folder):
+    return sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".gz"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed extraction over a shared SQLite work queue")
+    parser.add_argument("--queue", default=QUEUE_FILE)
+    parser.add_argument("--lease", type=float, default=LEASE_S, help="lease timeout in seconds")
+    sub = parser.add_subparsers(dest="command", required=True)
+    enq = sub.add_parser("enqueue", help="register the input files as tasks")
+    enq.add_argument("--input", default=data_folder)
+    enq.add_argument("--retry-failed", action="store_true")
+    sub.add_parser("work", help="claim and process tasks until the queue is drained")
+    sub.add_parser("status", help="task counts by state")
+    local = sub.add_parser("local", help="enqueue and run several workers on this machine")
+    local.add_argument("--input", default=data_folder)
+    local.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    if args.command in ("enqueue", "local"):
+        conn = connect(args.queue)
+        added = enqueue(conn, list_inputs(args.input), getattr(args, "retry_failed", False), args.lease)
+        print(f"✅ {added} new tasks queued")
+        conn.close()
+    if args.command == "work":
+        work(args.queue, args.lease)
+    elif args.command == "local":
+        # Separate interpreters, exactly as workers on other hosts would run
+        cmd = [sys.executable, os.path.abspath(__file__), "--queue", args.queue, "--lease", str(args.lease), "work"]
+        procs = [subprocess.Popen(cmd) for _ in range(args.workers)]
+        for p in procs:
+            p.wait()
+        status(connect(args.queue))
+    elif args.command == "status":
+        status(connect(args.queue))
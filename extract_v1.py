@@ -4,60 +4,11 @@ import xml.etree.ElementTree as ET
 import pandas as pd
 from concurrent.futures import ProcessPoolExecutor
 import multiprocessing
+from panel import load_panel
 
-# Protein to MeSH mapping
-protein_mesh_mapping = {
-    "Interleukin-18": ("IL18", "D020382"),
-    "Hepatocyte growth factor": ("HGF", "D017228"),
-    "C-C motif chemokine 19": ("CCL19", "D018451"),
-    "C-C motif chemokine 2": ("CCL2", "D018447"),
-    "Macrophage metalloelastase": ("MMP12", "D053508"),
-    "Lymphotoxin-alpha": ("LTA", "D008233"),
-    "Fms-related tyrosine kinase 3 ligand": ("FLT3LG", "D051941"),
-    "Tumor necrosis factor": ("TNF", "D014409"),
-    "Interleukin-17A": ("IL17A", "D020381"),
-    "Interleukin-17F": ("IL17F", "D020381"),
-    "Interleukin-17C": ("IL17C", "D020381"),
-    "Interleukin-2": ("IL2", "D007376"),
-    "Granulocyte colony-stimulating factor": ("CSF3", "D016179"),
-    "Interleukin-1 beta": ("IL1B", "D053583"),
-    "Oxidized low-density lipoprotein receptor 1": ("OLR1", "D051127"),
-    "Tumor necrosis factor ligand superfamily member 12": ("TNFSF12", "D000074049"),
-    "C-X-C motif chemokine 10": ("CXCL10", "D018481"),
-    "Vascular endothelial growth factor A": ("VEGFA", "D042461"),
-    "Interleukin-33": ("IL33", "D000067596"),
-    "Thymic stromal lymphopoietin": ("TSLP", "D000094632"),
-    "Interferon gamma": ("IFNG", "D015458"),
-    "C-C motif chemokine 4": ("CCL4", "D018449"),
-    "Protransforming growth factor alpha": ("TGFA", "D013923"),
-    "Interleukin-13": ("IL13", "D018793"),
-    "Interleukin-8": ("CXCL8", "D016209"),
-    "C-C motif chemokine 8": ("CCL8", "D018450"),
-    "Interleukin-6": ("IL6", "D015850"),
-    "C-C motif chemokine 13": ("CCL13", "D019214"),
-    "Granulocyte-macrophage colony-stimulating factor": ("CSF2", "D016178"),
-    "C-C motif chemokine 7": ("CCL7", "D018451"),
-    "Interleukin-4": ("IL4", "D015847"),
-    "Tumor necrosis factor ligand superfamily member 10": ("TNFSF10", "D053221"),
-    "Oncostatin-M": ("OSM", "D009816"),
-    "Interstitial collagenase": ("MMP1", "D020781"),
-    "Pro-epidermal growth factor": ("EGF", "D010048"),
-    "Interleukin-7": ("IL7", "D015851"),
-    "Interleukin-15": ("IL15", "D019409"),
-    "Macrophage colony-stimulating factor 1": ("CSF1", "D015441"),
-    "C-X-C motif chemokine 9": ("CXCL9", "D018480"),
-    "C-X-C motif chemokine 11": ("CXCL11", "D018482"),
-    "Stromal cell-derived factor 1": ("CXCL12", "D054377"),
-    "Eotaxin": ("CCL11", "D004740"),
-    "Interleukin-10": ("IL10", "D016753"),
-    "C-C motif chemokine 3": ("CCL3", "D018448"),
-    "Interleukin-27": ("EBI3_IL27", "D064094")
-}
-
-# Mapping UI -> protein names
-ui_to_proteins = {}
-for protein, (_, ui) in protein_mesh_mapping.items():
-    ui_to_proteins.setdefault(ui, []).append(protein)
+# Mapping UI -> protein names, from the protein panel
+panel = load_panel()
+ui_to_proteins = {ui: [panel.names[c] for c in codes] for ui, codes in panel.ui_to_codes.items()}
 
 
 def process_file(file_path):
@@ -93,7 +44,7 @@ def process_file(file_path):
                 for text, ui in chemicals:
                     if ui in ui_to_proteins:
                         if ui == "D020381":  # special case for IL17 family
-                            if text in ["Interleukin-17A", "Interleukin-17F", "Interleukin-17C"]:
+                            if text in ui_to_proteins[ui]:
                                 matched_proteins.append(text)
                                 matched_uis.append(ui)
                         else:
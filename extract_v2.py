@@ -4,29 +4,10 @@ import xml.etree.ElementTree as ET
 import pandas as pd
 from concurrent.futures import ProcessPoolExecutor
 import multiprocessing
+from panel import load_panel
 
 # Protein list
-proteins = [
-    "Interleukin-18", "Hepatocyte growth factor", "C-C motif chemokine 19",
-    "C-C motif chemokine 2", "Macrophage metalloelastase", "Lymphotoxin-alpha",
-    "Fms-related tyrosine kinase 3 ligand", "Tumor necrosis factor",
-    "Interleukin-17A", "Interleukin-17F", "Interleukin-17C", "Interleukin-2",
-    "Granulocyte colony-stimulating factor", "Interleukin-1 beta",
-    "Oxidized low-density lipoprotein receptor 1",
-    "Tumor necrosis factor ligand superfamily member 12",
-    "C-X-C motif chemokine 10", "Vascular endothelial growth factor A",
-    "Interleukin-33", "Thymic stromal lymphopoietin", "Interferon gamma",
-    "C-C motif chemokine 4", "Protransforming growth factor alpha",
-    "Interleukin-13", "Interleukin-8", "C-C motif chemokine 8", "Interleukin-6",
-    "C-C motif chemokine 13", "Granulocyte-macrophage colony-stimulating factor",
-    "C-C motif chemokine 7", "Interleukin-4",
-    "Tumor necrosis factor ligand superfamily member 10", "Oncostatin-M",
-    "Interstitial collagenase", "Pro-epidermal growth factor",
-    "Interleukin-7", "Interleukin-15", "Macrophage colony-stimulating factor 1",
-    "C-X-C motif chemokine 9", "C-X-C motif chemokine 11", "Interleukin-17C",
-    "Stromal cell-derived factor 1", "Eotaxin", "Interleukin-10",
-    "C-C motif chemokine 3", "Interleukin-27"
-]
+proteins = load_panel().names
 
 def process_file(file_path):
     matches = []
@@ -4,14 +4,15 @@ import xml.etree.ElementTree as ET
 import pandas as pd
 from concurrent.futures import ProcessPoolExecutor
 import multiprocessing
+from reference_data import load_protein_synonyms
 
 # === Load protein synonyms ===
-syn_df = pd.read_csv("protein_synonyms.csv")
+syn_df = load_protein_synonyms("protein_synonyms.csv")
 
 # Create mapping: canonical name -> list of synonyms (lowercase for fast search)
 protein_synonyms = {
-    row["Protein"]: [s.strip().lower() for s in str(row["Synonyms"]).split(";") if s.strip()]
-    for _, row in syn_df.iterrows()
+    protein: [s.lower() for s in syns]
+    for protein, syns in syn_df.group_by("Protein", maintain_order=True).agg("Synonym").iter_rows()
 }
 
 # Flatten all possible protein terms for search
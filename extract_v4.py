@@ -1,25 +1,24 @@
+import io
 import os
 import gzip
+import queue
+import signal
+import threading
 import xml.etree.ElementTree as ET
 import pandas as pd
 import re
 from concurrent.futures import ProcessPoolExecutor
 import multiprocessing
 from sentence_splitter import SentenceSplitter, split_text_into_sentences
+from text_normalization import (
+    SENTENCE_SEPARATOR, clean_sentence, normalize_with_offsets, encode_offsets
+)
+from panel import load_panel
+from progress import Progress, reporter, init_worker as init_progress
 
-# Load protein synonyms
-syn_df = pd.read_csv("protein_synonyms.csv")
-
-# Normalize a synonym (lowercase, hyphen/space-insensitive)
-def normalize_synonym(s):
-    return re.sub(r'[-\s]+', '', s.strip().lower())
-
-# Create mapping: canonical name -> list of normalized synonyms
-protein_synonyms = {}
-for _, row in syn_df.iterrows():
-    all_names = [row["Protein"]] + str(row["Synonyms"]).replace("\t", " ").split(";")
-    cleaned = list(set(normalize_synonym(s) for s in all_names if s.strip()))
-    protein_synonyms[row["Protein"].strip()] = cleaned
+# Load the protein panel: protein code -> list of normalized synonyms
+panel = load_panel()
+protein_synonyms = dict(enumerate(panel.normalized_synonyms))
 
 # Flatten for info
 all_terms = {s for syns in protein_synonyms.values() for s in syns}
@@ -31,85 +30,256 @@ print(f"✅ Loaded {len(protein_synonyms)} proteins with {len(all_terms)} total
 
 splitter = SentenceSplitter(language='en')
 
-# Normalize text for flexible matching (case-insensitive, remove hyphens/spaces)
-def normalize_text(text):
-    return re.sub(r'[-\s]+', '', text.lower())
+def parse_articles(f):
+    # Yield (PubMedID, abstract text) for every English article with an abstract
+    tree = ET.parse(f)
+    root = tree.getroot()
+    for article in root.findall(".//PubmedArticle"):
+        lang = article.findtext(".//Language")
+        if lang != "eng":
+            continue
 
-def process_file(file_path):
+        # Extract abstract text
+        abstracts = [abst.text for abst in article.findall(".//Abstract/AbstractText") if abst.text]
+        if not abstracts:
+            continue
+        pubmed_id = article.findtext(".//ArticleId[@IdType='pubmed']")
+        yield pubmed_id, " ".join(abstracts)
+
+
+def match_proteins(sent_norm):
+    # sent_norm is the normalized sentence (case-insensitive, hyphens/spaces removed)
+    matched = set()
+
+    for prot, syns in protein_synonyms.items():
+        if any(re.search(rf'\b{re.escape(syn)}\b', sent_norm) for syn in syns):
+            matched.add(prot)
+    return matched
+
+
+def match_abstract(pubmed_id, abstract_text):
+    # sentences = re.split(sentence_splitter, abstract_text)
+    sentences = splitter.split(abstract_text)
+
+    relevant_sentences = []
+    normalized_sentences = []
+    sentence_offsets = []
+    proteins_in_abstract = set()
+
+    for sent in sentences:
+        # Normalize once; the normalized form and its offsets are stored for downstream steps
+        sent = clean_sentence(sent)
+        sent_norm, runs = normalize_with_offsets(sent)
+        matched = match_proteins(sent_norm)
+        if len(matched) >= 2:
+            relevant_sentences.append(sent)
+            normalized_sentences.append(sent_norm)
+            sentence_offsets.append(encode_offsets(runs))
+            proteins_in_abstract.update(matched)
+
+    if not relevant_sentences:
+        return None  # skip abstracts without ≥2-protein sentences
+
+    return {
+        "PubMedID": pubmed_id,
+        "Protein_Codes": panel.encode(proteins_in_abstract),
+        "Abstract": abstract_text.strip(),
+        "Relevant_Sentences": SENTENCE_SEPARATOR.join(relevant_sentences),
+        "Normalized_Sentences": SENTENCE_SEPARATOR.join(normalized_sentences),
+        "Sentence_Offsets": SENTENCE_SEPARATOR.join(sentence_offsets)
+    }
+
+
+def save_matches(matches, filename, output_folder="Result-v4"):
+    os.makedirs(output_folder, exist_ok=True)
+    output_filename = os.path.splitext(filename)[0] + "_2prot_sentences.csv"
+    output_path = os.path.join(output_folder, output_filename)
+    df = pd.DataFrame(matches)
+    df.to_csv(output_path, index=False)
+    return output_filename
+
+
+def match_stream(f, filename):
+    # Matches for every article in an XML stream, None when the file cannot be parsed
     matches = []
+    report = reporter()
+    try:
+        for pubmed_id, abstract_text in parse_articles(f):
+            report.add(articles=1)
+            match = match_abstract(pubmed_id, abstract_text)
+            if match:
+                matches.append(match)
+    except ET.ParseError as e:
+        print(f"⚠️ XML parse error in {filename}: {e}")
+        return None
+    return matches
+
+
+def process_file(file_path):
     filename = os.path.basename(file_path)
 
     try:
-        with gzip.open(file_path, "rt", encoding="utf-8") as f:
-            try:
-                tree = ET.parse(f)
-            except ET.ParseError as e:
-                print(f"⚠️ XML parse error in {filename}: {e}")
-                return 0
-
-            root = tree.getroot()
-            for article in root.findall(".//PubmedArticle"):
-                lang = article.findtext(".//Language")
-                if lang != "eng":
-                    continue
-
-                # Extract abstract text
-                abstracts = [abst.text for abst in article.findall(".//Abstract/AbstractText") if abst.text]
-                if not abstracts:
-                    continue
-                abstract_text = " ".join(abstracts)
-                # sentences = re.split(sentence_splitter, abstract_text)
-                sentences = splitter.split(abstract_text)
-
-                relevant_sentences = []
-                proteins_in_abstract = set()
-
-                for sent in sentences:
-                    sent_norm = normalize_text(sent)
-                    matched = set()
-
-                    for prot, syns in protein_synonyms.items():
-                        if any(re.search(rf'\b{re.escape(syn)}\b', sent_norm) for syn in syns):
-                            matched.add(prot)
-                    if len(matched) >= 2:
-                        relevant_sentences.append(sent.strip())
-                        proteins_in_abstract.update(matched)
-
-                if not relevant_sentences:
-                    continue  # skip abstracts without ≥2-protein sentences
-
-                pubmed_id = article.findtext(".//ArticleId[@IdType='pubmed']")
-                matches.append({
-                    "PubMedID": pubmed_id,
-                    "Matched_Proteins": "; ".join(sorted(proteins_in_abstract)),
-                    "Abstract": abstract_text.strip(),
-                    "Relevant_Sentences": " || ".join(relevant_sentences)
-                })
-
+        with gzip.open(file_path, "rb") as f:
+            matches = match_stream(f, filename)
     except Exception as e:
         print(f"⚠️ Error reading {filename}: {e}")
         return 0
 
     # Save matches
     if matches:
-        os.makedirs("Result-v4", exist_ok=True)
-        output_filename = os.path.splitext(filename)[0] + "_2prot_sentences.csv"
-        output_path = os.path.join("Result-v4", output_filename)
-        df = pd.DataFrame(matches)
-        df.to_csv(output_path, index=False)
+        output_filename = save_matches(matches, filename)
         print(f"✅ {filename}: {len(matches)} abstracts saved to {output_filename}")
         return len(matches)
 
     return 0
 
 
+# === Pipelined run: reader thread -> parse/match processes -> writer thread ===
+READ_AHEAD = 2              # compressed files buffered between the reader and the workers
+IN_FLIGHT_PER_WORKER = 2    # files queued, being parsed or waiting to be written, per worker process
+
+
+def match_compressed(filename, data):
+    # Parse/match stage, runs in a worker process on a file the reader already loaded
+    reporter().begin(filename)
+    try:
+        with gzip.GzipFile(fileobj=io.BytesIO(data)) as f:
+            return filename, match_stream(f, filename)
+    except Exception as e:
+        print(f"⚠️ Error reading {filename}: {e}")
+        return filename, None
+    finally:
+        reporter().end(bytes=len(data))
+
+
+def init_worker(progress_queue):
+    # Ctrl-C reaches the whole process group, the parent decides how workers wind down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    init_progress(progress_queue)
+
+
+def put_unless_stopped(q, item, stop):
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def read_files(paths, read_q, stop):
+    # Reader stage: plain file I/O, blocks while the workers are behind
+    for path in paths:
+        filename = os.path.basename(path)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            print(f"⚠️ Error reading {filename}: {e}")
+            data = None
+        if not put_unless_stopped(read_q, (filename, data), stop):
+            return
+    put_unless_stopped(read_q, None, stop)
+
+
+def write_results(write_q, counts, slots):
+    # Writer stage: the only place output files are written. A file's slot is released only once
+    # it is on disk, so a slow writer holds the workers back instead of queueing up results
+    while True:
+        item = write_q.get()
+        if item is None:
+            break
+        filename, matches = item
+        try:
+            counts[filename] = len(matches) if matches else 0
+            if matches:
+                output_filename = save_matches(matches, filename)
+                print(f"✅ {filename}: {len(matches)} abstracts saved to {output_filename}")
+        except Exception as e:
+            print(f"⚠️ Error writing {filename}: {e!r}")
+        finally:
+            slots.release()
+
+
+def run_pipeline(gz_files, max_workers=None):
+    workers = max_workers or os.cpu_count()
+    read_q = queue.Queue(maxsize=READ_AHEAD)
+    write_q = queue.Queue()
+    capacity = workers * IN_FLIGHT_PER_WORKER
+    slots = threading.BoundedSemaphore(capacity)
+    stop = threading.Event()
+    counts = {}
+    progress = Progress("extract_v4", total_items=len(gz_files),
+                        total_bytes=sum(os.path.getsize(path) for path in gz_files))
+
+    def on_done(filename, future):
+        if future.cancelled():
+            return  # abandoned by a second Ctrl-C, nothing waits for its slot any more
+        try:
+            write_q.put(future.result())
+        except Exception as e:
+            print(f"⚠️ Worker failed on {filename}: {e!r}")
+            write_q.put((filename, None))
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(progress.queue,))
+    reader = threading.Thread(target=read_files, args=(gz_files, read_q, stop), daemon=True)
+    writer = threading.Thread(target=write_results, args=(write_q, counts, slots))
+    try:
+        # Start the worker processes before any thread exists, forking a threaded process is unsafe
+        executor.submit(int).result()
+        progress.start()
+        reader.start()
+        writer.start()
+
+        while True:
+            item = read_q.get()
+            if item is None:
+                break
+            filename, data = item
+            slots.acquire()  # backpressure: bounded number of files being parsed or waiting to be written
+            if data is None:
+                write_q.put((filename, None))
+                continue
+            future = executor.submit(match_compressed, filename, data)
+            future.add_done_callback(lambda fut, name=filename: on_done(name, fut))
+    except BaseException:
+        # Stop reading; files already in the pool (at most workers * IN_FLIGHT_PER_WORKER) still finish
+        stop.set()
+        raise
+    finally:
+        # Drain: the writer returns a slot once its file is on disk, so holding all of them means
+        # every submitted file was written. Ctrl-C while draining after an interrupt stops waiting
+        drained = 0
+        try:
+            while drained < capacity:
+                try:
+                    # Timed, a signal delivered to another thread would not wake a blocking acquire
+                    if slots.acquire(timeout=0.5):
+                        drained += 1
+                except KeyboardInterrupt:
+                    if stop.is_set():
+                        raise
+                    stop.set()
+                    print("⚠️ Interrupted, finishing the files already submitted (Ctrl-C again to stop without them)")
+        finally:
+            write_q.put(None)
+            if writer.is_alive():
+                writer.join()
+            executor.shutdown(wait=drained == capacity, cancel_futures=True)
+            progress.close()
+        if len(counts) < len(gz_files):
+            print(f"⚠️ Interrupted: {len(gz_files) - len(counts)} of {len(gz_files)} files were not processed")
+
+    return [counts.get(os.path.basename(path), 0) for path in gz_files]
+
+
 if __name__ == "__main__":
     multiprocessing.freeze_support()
     data_folder = "Data"
     gz_files = [os.path.join(data_folder, f) for f in os.listdir(data_folder) if f.endswith(".gz")]
 
-    with ProcessPoolExecutor() as executor:
-        results = list(executor.map(process_file, gz_files))
+    results = run_pipeline(gz_files)
 
     print("\n✅ All files processed!")
     print("Matches per file:", results)
@@ -0,0 +1,72 @@
+import os
+import sys
+from functools import lru_cache
+import polars as pl
+from text_normalization import normalize_text
+from reference_data import load_protein_mesh, load_protein_synonyms
+
+# The protein panel, loaded once from the reference files. Proteins are addressed by small integer
+# codes (their row in the panel file) so workers match and write ints instead of long names.
+# Point PROTEIN_PANEL / PROTEIN_SYNONYMS at other files to run a different panel.
+
+PANEL_FILE = os.environ.get("PROTEIN_PANEL", "protein_mesh.csv")
+SYNONYM_FILE = os.environ.get("PROTEIN_SYNONYMS", "protein_synonyms.csv")
+PROTEIN_LIST_FILE = "proteins_original.txt"
+CODE_SEPARATOR = ";"
+
+
+class Panel:
+    def __init__(self, rows, synonyms):
+        # rows: (name, gene, uniprot, mesh_heading, mesh_ui) in panel order
+        self.names = [sys.intern(r[0]) for r in rows]
+        self.genes = [sys.intern(r[1]) for r in rows]
+        self.uniprot = [r[2] for r in rows]
+        self.mesh_headings = [r[3] for r in rows]
+        self.mesh_uis = [sys.intern(r[4]) for r in rows]
+        self.code = {name: i for i, name in enumerate(self.names)}
+
+        # Raw synonyms as listed in the synonym file, and the normalized forms used for matching
+        self.synonyms = [synonyms.get(name, []) for name in self.names]
+        self.normalized_synonyms = [
+            sorted({normalize_text(s) for s in [name] + syns})
+            for name, syns in zip(self.names, self.synonyms)
+        ]
+
+        self.ui_to_codes = {}
+        for i, ui in enumerate(self.mesh_uis):
+            self.ui_to_codes.setdefault(ui, []).append(i)
+
+    def __len__(self):
+        return len(self.names)
+
+    def encode(self, codes):
+        return CODE_SEPARATOR.join(str(c) for c in sorted(codes))
+
+    def decode(self, encoded):
+        return [self.names[int(c)] for c in str(encoded).split(CODE_SEPARATOR) if c != ""]
+
+
+def read_protein_list(path=PROTEIN_LIST_FILE):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def read_synonyms(path=SYNONYM_FILE):
+    syn_df = load_protein_synonyms(path)
+    return {protein: syns for protein, syns in syn_df.group_by("Protein", maintain_order=True).agg("Synonym").iter_rows()}
+
+
+def read_panel_rows(path=PANEL_FILE):
+    df = load_protein_mesh(path).with_columns(pl.col("MeSH_Heading").fill_null(""))
+    return df.select(["Protein", "Gene", "UniProtID", "MeSH_Heading", "MeSH_UI"]).rows()
+
+
+@lru_cache(maxsize=None)
+def load_panel(panel_file=PANEL_FILE, synonym_file=SYNONYM_FILE):
+    # synonym_file=None loads the panel without synonyms (used while generating them)
+    rows = read_panel_rows(panel_file)
+    synonyms = read_synonyms(synonym_file) if synonym_file else {}
+    missing = [r[0] for r in rows if r[0] not in synonyms]
+    if synonym_file and missing:
+        print(f"⚠️ No synonyms for {len(missing)} panel proteins: {', '.join(missing)}")
+    return Panel(rows, synonyms)
@@ -0,0 +1,256 @@
+import os
+import json
+import time
+import queue
+import threading
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Live progress for long runs. Workers count into a local Reporter that sends one batched message
+# per FLUSH_S to the parent; the parent aggregates them in a background thread, prints a status
+# line and atomically rewrites a JSON status file (progress_<name>.json) every INTERVAL_S. Set
+# PROGRESS_PORT to also serve the same JSON on http://127.0.0.1:<port>/.
+#
+#   progress = Progress("extract_v4", total_items=len(files), total_bytes=sum(sizes))
+#   pool initializer: init_worker(progress.queue)     in the worker: reporter().add(articles=1)
+#   progress.start() ... progress.close()
+
+FLUSH_S = 1.0           # worker batching interval
+INTERVAL_S = 5.0        # status file refresh
+PRINT_S = 30.0          # status line on stdout
+STALL_S = 120.0         # a busy worker silent for this long is flagged
+STATUS_FILE = os.environ.get("PROGRESS_FILE", "progress_{name}.json")
+PORT = os.environ.get("PROGRESS_PORT")
+
+
+class Reporter:
+    # Worker-side counters, sent as one message per flush instead of one per article
+    def __init__(self, q, worker=None):
+        self.q = q
+        self.worker = worker or str(os.getpid())
+        self.items = self.articles = self.bytes = 0
+        self.current = None
+        self.last_flush = time.monotonic()
+
+    def add(self, items=0, articles=0, bytes=0):
+        self.items += items
+        self.articles += articles
+        self.bytes += bytes
+        if time.monotonic() - self.last_flush >= FLUSH_S:
+            self.flush()
+
+    def begin(self, current):
+        # Name of the unit being worked on, sent right away so stragglers show up by name
+        self.current = current
+        self.flush()
+
+    def end(self, bytes=0):
+        self.items += 1
+        self.bytes += bytes
+        self.current = None
+        self.flush()
+
+    def flush(self):
+        self.q.put((self.worker, self.items, self.articles, self.bytes, self.current, time.time()))
+        self.items = self.articles = self.bytes = 0
+        self.last_flush = time.monotonic()
+
+
+class NullReporter:
+    def add(self, items=0, articles=0, bytes=0):
+        pass
+
+    def begin(self, current):
+        pass
+
+    def end(self, bytes=0):
+        pass
+
+    def flush(self):
+        pass
+
+
+_reporter = NullReporter()
+
+
+def init_worker(q):
+    # Pool initializer; without it reporter() is a no-op and the stages run unchanged
+    global _reporter
+    _reporter = Reporter(q) if q is not None else NullReporter()
+
+
+def reporter():
+    return _reporter
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "?"
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h{m:02d}m" if h else f"{m}m{s:02d}s"
+
+
+class Progress:
+    def __init__(self, name, total_items=0, total_bytes=0, unit="files", mp_context=None,
+                 status_file=STATUS_FILE, port=PORT):
+        self.name = name
+        self.unit = unit
+        self.total_items = total_items
+        self.total_bytes = total_bytes
+        self.status_file = status_file.format(name=name) if status_file else None
+        self.port = int(port) if port else None
+        self.queue = (mp_context or multiprocessing).Queue()
+        self.workers = {}
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.thread = None
+        self.server = None
+        self.started = None
+
+    def start(self):
+        # Call after the worker processes exist (fork of a process with threads is unsafe)
+        self.started = time.time()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        if self.port:
+            self.server = ThreadingHTTPServer(("127.0.0.1", self.port), self._handler())
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def local_reporter(self, worker="main"):
+        return Reporter(self.queue, worker)
+
+    def close(self):
+        self.stopping.set()
+        if self.thread:
+            self.thread.join()
+        if self.server:
+            self.server.shutdown()
+        self.write(final=True)
+        print(self.line(self.snapshot(final=True)))
+
+    def _apply(self, message):
+        worker, items, articles, nbytes, current, now = message
+        with self.lock:
+            w = self.workers.setdefault(worker, {
+                "items": 0, "articles": 0, "bytes": 0, "first_seen": now,
+                "current": None, "current_since": None,
+            })
+            w["items"] += items
+            w["articles"] += articles
+            w["bytes"] += nbytes
+            w["last_seen"] = now
+            if current != w["current"]:
+                w["current"], w["current_since"] = current, (now if current else None)
+
+    def _drain(self, timeout):
+        try:
+            self._apply(self.queue.get(timeout=timeout))
+            while True:
+                self._apply(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+
+    def _run(self):
+        next_write = time.monotonic()
+        next_print = next_write + PRINT_S
+        while not self.stopping.is_set():
+            self._drain(timeout=max(0.0, min(next_write - time.monotonic(), 0.5)))
+            now = time.monotonic()
+            if now >= next_write:
+                self.write()
+                next_write = now + INTERVAL_S
+            if now >= next_print:
+                print(self.line(self.snapshot()))
+                next_print = now + PRINT_S
+        # Messages still in flight after the last worker finished
+        self._drain(timeout=0.5)
+
+    def snapshot(self, final=False):
+        now = time.time()
+        elapsed = max(now - self.started, 1e-9) if self.started else 0.0
+        with self.lock:
+            workers = {k: dict(v) for k, v in self.workers.items()}
+        items = sum(w["items"] for w in workers.values())
+        articles = sum(w["articles"] for w in workers.values())
+        nbytes = sum(w["bytes"] for w in workers.values())
+
+        # ETA from input bytes when known, processed units otherwise
+        eta = None
+        if self.total_bytes and nbytes:
+            eta = (self.total_bytes - nbytes) / (nbytes / elapsed)
+        elif self.total_items and items:
+            eta = (self.total_items - items) / (items / elapsed)
+
+        per_worker = {}
+        for name, w in sorted(workers.items()):
+            span = max(now - w["first_seen"], 1e-9)
+            idle = now - w["last_seen"]
+            per_worker[name] = {
+                "items": w["items"],
+                "articles": w["articles"],
+                "articles_per_s": round(w["articles"] / span, 1),
+                "mb_per_s": round(w["bytes"] / span / 1e6, 3),
+                "current": w["current"],
+                "current_for_s": round(now - w["current_since"], 1) if w["current_since"] else None,
+                "idle_s": round(idle, 1),
+                "stalled": bool(w["current"]) and idle > STALL_S,
+            }
+        return {
+            "name": self.name,
+            "finished": final,
+            "updated": now,
+            "elapsed_s": round(elapsed, 1),
+            "unit": self.unit,
+            "items_done": items,
+            "items_total": self.total_items,
+            "articles": articles,
+            "bytes_done": nbytes,
+            "bytes_total": self.total_bytes,
+            "articles_per_s": round(articles / elapsed, 1) if elapsed else 0.0,
+            "mb_per_s": round(nbytes / elapsed / 1e6, 3) if elapsed else 0.0,
+            "eta_s": None if final or eta is None else round(max(eta, 0.0), 1),
+            "workers": per_worker,
+        }
+
+    def line(self, status):
+        total = f"/{status['items_total']}" if status["items_total"] else ""
+        stalled = sum(w["stalled"] for w in status["workers"].values())
+        # Stages that count units rather than input bytes have no MB/s to show
+        rate = f"{status['mb_per_s']:.2f} MB/s, " if status["bytes_done"] or status["bytes_total"] else ""
+        text = (
+            f"⏳ {self.name}: {status['items_done']}{total} {self.unit}, "
+            f"{status['articles_per_s']:.0f} articles/s, {rate}"
+            f"elapsed {format_duration(status['elapsed_s'])}"
+        )
+        if status["finished"]:
+            return text.replace("⏳", "✅", 1)
+        text += f", ETA {format_duration(status['eta_s'])}"
+        return text + (f", ⚠️ {stalled} stalled workers" if stalled else "")
+
+    def write(self, final=False):
+        if not self.status_file:
+            return
+        tmp = self.status_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(final), f, indent=2)
+        os.replace(tmp, self.status_file)
+
+    def _handler(self):
+        progress = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(progress.snapshot()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,230 @@
+import json
+import bisect
+import argparse
+import polars as pl
+from text_normalization import clean_sentence
+
+# Packs the extracted sentences into LLM prompts of a bounded token size. Each PubMed article is
+# one group: its relevant (≥2-protein) sentences first, then optionally the rest of its abstract as
+# context. Groups that do not fit the budget are truncated from the end, so protein sentences are
+# the last to go. Groups are bin-packed best-fit decreasing to keep the number of requests low.
+# The input is the per-sentence table after disambiguation, so dropped low-confidence hits never
+# reach a prompt; split.py output and the per-article results file are accepted as well.
+
+input_file = "sentences_disambiguated.csv"
+ABSTRACT_FILE = "Result-v4/all_results_cleaned.csv"
+output_file = "prompts.jsonl"
+REPORT_FILE = "prompt_plan.json"
+
+PROMPT_BUDGET = 4000        # tokens per request, including the instructions
+INSTRUCTION_TOKENS = 200    # reserved for the fixed instruction text
+CHARS_PER_TOKEN = 4.0       # used when no tokenizer is installed
+CALIBRATION_SAMPLE = 2000
+REQUEST_OVERHEAD_S = 0.5    # latency model: fixed cost per request ...
+TOKENS_PER_S = 2000.0       # ... plus input processing time
+
+
+def load_tokenizer(name="cl100k_base"):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding(name)
+
+
+def calibrate(texts, tokenizer):
+    # Characters per token on a sample, so the bulk estimate stays a vectorized length division
+    if tokenizer is None or not texts:
+        return CHARS_PER_TOKEN
+    sample = texts[:CALIBRATION_SAMPLE]
+    tokens = sum(len(t) for t in tokenizer.encode_batch(sample))
+    return sum(len(t) for t in sample) / max(tokens, 1)
+
+
+def token_estimate(expr, chars_per_token):
+    return (expr.str.len_chars() / chars_per_token).ceil().cast(pl.Int64) + 1
+
+
+def relevant_sentences(df):
+    # One row per (PubMedID, sentence) from a per-sentence table or the per-article results
+    if "Relevant_Sentence" in df.columns:
+        sentences = df.select(["PubMedID", pl.col("Relevant_Sentence").alias("Sentence")])
+    else:
+        sentences = (
+            df.select(["PubMedID", pl.col("Relevant_Sentences").str.split("||").alias("Sentence")])
+            .explode("Sentence")
+        )
+    # Header proteins: those of the sentences that are kept (Sentence_Proteins after disambiguation)
+    proteins = "Sentence_Proteins" if "Sentence_Proteins" in df.columns else "Matched_Proteins"
+    header = (
+        df.select(["PubMedID", pl.col(proteins).str.split(";").alias("Protein")])
+        .explode("Protein")
+        .with_columns(pl.col("Protein").str.strip_chars())
+        .filter(pl.col("Protein").is_not_null() & (pl.col("Protein") != ""))
+        .group_by("PubMedID", maintain_order=True)
+        .agg(pl.col("Protein").unique().sort().str.join("; ").alias("Matched_Proteins"))
+    )
+    return (
+        sentences.with_columns(pl.col("Sentence").str.strip_chars())
+        .filter(pl.col("Sentence").is_not_null() & (pl.col("Sentence") != ""))
+        .join(header, on="PubMedID", how="left")
+        .with_columns(pl.col("Matched_Proteins").fill_null(""))
+        .select(["PubMedID", "Matched_Proteins", "Sentence"])
+    )
+
+
+def sentence_table(relevant, abstracts=None):
+    # Relevant sentences with their priority (0) and, when abstracts are given, the rest of each
+    # abstract as context (priority 1). Context never includes a protein sentence from extraction,
+    # so sentences removed by disambiguation do not come back that way. The split sentences get the
+    # same clean_sentence as extraction, otherwise the anti-joins miss truncated or spaced ones.
+    relevant = (
+        relevant.with_columns(pl.lit(0).alias("Priority"))
+        .with_columns(pl.int_range(pl.len()).over("PubMedID").alias("Position"))
+    )
+    if abstracts is None:
+        return relevant
+
+    from sentence_splitter import SentenceSplitter
+    splitter = SentenceSplitter(language="en")
+    headers = relevant.select(["PubMedID", "Matched_Proteins"]).unique("PubMedID")
+    context = (
+        abstracts.join(headers, on="PubMedID")
+        .select([
+            "PubMedID", "Matched_Proteins",
+            pl.col("Abstract").map_elements(lambda a: [clean_sentence(s) for s in splitter.split(a)],
+                                            return_dtype=pl.List(pl.Utf8)).alias("Sentence"),
+        ])
+        .explode("Sentence")
+        .with_columns(pl.lit(1).alias("Priority"))
+        .with_columns(pl.int_range(pl.len()).over("PubMedID").alias("Position"))
+        .join(relevant_sentences(abstracts).select(["PubMedID", "Sentence"]), on=["PubMedID", "Sentence"], how="anti")
+        .join(relevant.select(["PubMedID", "Sentence"]), on=["PubMedID", "Sentence"], how="anti")
+        .select(relevant.columns)
+    )
+    return pl.concat([relevant, context]).filter(pl.col("Sentence") != "")
+
+
+def plan_groups(sentences, chars_per_token, group_budget):
+    # Keep sentences in priority order until the group budget is used up
+    return (
+        sentences
+        .with_columns(token_estimate(pl.col("Sentence"), chars_per_token).alias("Tokens"))
+        .sort(["PubMedID", "Priority", "Position"])
+        .with_columns(
+            (token_estimate(pl.col("Matched_Proteins"), chars_per_token) + 8).alias("Header_Tokens"),
+            pl.col("Tokens").cum_sum().over("PubMedID").alias("Running"),
+        )
+        .with_columns((pl.col("Running") + pl.col("Header_Tokens") <= group_budget).alias("Kept"))
+    )
+
+
+def pack(sizes, capacity):
+    # Best-fit decreasing: every group goes to the fullest prompt that still has room
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i], reverse=True)
+    free = []       # sorted remaining capacities
+    free_bins = []  # bin id for each entry of free
+    bins = []
+    for i in order:
+        j = bisect.bisect_left(free, sizes[i])
+        if j == len(free):
+            bins.append([i])
+            b = len(bins) - 1
+            remaining = capacity - sizes[i]
+        else:
+            b = free_bins.pop(j)
+            remaining = free.pop(j) - sizes[i]
+            bins[b].append(i)
+        k = bisect.bisect_left(free, remaining)
+        free.insert(k, remaining)
+        free_bins.insert(k, b)
+    return bins
+
+
+def render_group(pmid, proteins, sentences):
+    lines = [f"PMID {pmid} | Proteins: {proteins}"]
+    lines.extend(f"- {s}" for s in sentences)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Token-budget aware prompt batching")
+    parser.add_argument("--input", default=input_file)
+    parser.add_argument("--output", default=output_file)
+    parser.add_argument("--budget", type=int, default=PROMPT_BUDGET)
+    parser.add_argument("--instruction-tokens", type=int, default=INSTRUCTION_TOKENS)
+    parser.add_argument("--context", action="store_true", help="fill spare room with the rest of the abstract")
+    parser.add_argument("--abstracts", default=ABSTRACT_FILE, help="results file the abstracts are joined from")
+    parser.add_argument("--concurrency", type=int, default=1, help="parallel requests in the latency estimate")
+    args = parser.parse_args()
+
+    relevant = relevant_sentences(pl.read_csv(args.input).drop_nulls("PubMedID"))
+    abstracts = None
+    if args.context:
+        abstracts = (
+            pl.read_csv(args.abstracts).select(["PubMedID", "Matched_Proteins", "Abstract", "Relevant_Sentences"])
+            .drop_nulls().unique("PubMedID", keep="first")
+        )
+    tokenizer = load_tokenizer()
+    chars_per_token = calibrate(relevant["Sentence"].head(CALIBRATION_SAMPLE).to_list(), tokenizer)
+    group_budget = args.budget - args.instruction_tokens
+    n_articles = relevant["PubMedID"].n_unique()
+
+    planned = plan_groups(sentence_table(relevant, abstracts), chars_per_token, group_budget)
+    groups = (
+        planned.filter(pl.col("Kept"))
+        .group_by("PubMedID", maintain_order=True)
+        .agg(
+            pl.col("Matched_Proteins").first(),
+            pl.col("Sentence"),
+            (pl.col("Tokens").sum() + pl.col("Header_Tokens").first()).alias("Group_Tokens"),
+        )
+    )
+    dropped = planned.filter(~pl.col("Kept"))
+    dropped_relevant = dropped.filter(pl.col("Priority") == 0)
+    # Groups whose header alone exceeds the budget are skipped entirely
+    skipped = n_articles - groups.height
+
+    sizes = groups["Group_Tokens"].to_list()
+    bins = pack(sizes, group_budget)
+    rows = groups.select(["PubMedID", "Matched_Proteins", "Sentence"]).rows()
+    with open(args.output, "w", encoding="utf-8") as f:
+        for n, members in enumerate(bins):
+            members = sorted(members)
+            text = "\n\n".join(render_group(*rows[i]) for i in members)
+            f.write(json.dumps({
+                "prompt_id": n,
+                "pmids": [rows[i][0] for i in members],
+                "estimated_tokens": sum(sizes[i] for i in members) + args.instruction_tokens,
+                "text": text,
+            }) + "\n")
+
+    total_tokens = sum(sizes) + len(bins) * args.instruction_tokens
+    naive_tokens = sum(sizes) + len(sizes) * args.instruction_tokens
+
+    def latency(requests, tokens):
+        return (requests * REQUEST_OVERHEAD_S + tokens / TOKENS_PER_S) / max(args.concurrency, 1)
+
+    report = {
+        "tokenizer": "tiktoken" if tokenizer else "approximation",
+        "chars_per_token": round(chars_per_token, 3),
+        "budget": args.budget,
+        "articles": n_articles,
+        "articles_skipped": skipped,
+        "sentences_kept": planned.height - dropped.height,
+        "sentences_truncated": dropped.height,
+        "relevant_sentences_truncated": dropped_relevant.height,
+        "requests": len(bins),
+        "requests_one_per_article": len(sizes),
+        "estimated_input_tokens": total_tokens,
+        "estimated_input_tokens_one_per_article": naive_tokens,
+        "mean_prompt_fill": round(total_tokens / (len(bins) * args.budget), 3) if bins else 0,
+        "estimated_latency_s": round(latency(len(bins), total_tokens), 1),
+        "estimated_latency_one_per_article_s": round(latency(len(sizes), naive_tokens), 1),
+    }
+    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Saved {len(bins)} prompts to '{args.output}' (plan in '{REPORT_FILE}')")
+    for key, value in report.items():
+        print(f"  {key}: {value}")
@@ -0,0 +1,132 @@
+import os
+import hashlib
+import tempfile
+import polars as pl
+
+# Typed loaders for the reference tables. The raw files are parsed, normalized and validated
+# with polars once; the clean table is cached as Parquet next to a key of the source file's
+# size and modification time, so later runs start with a single columnar read.
+
+CACHE_DIR = os.environ.get("REFERENCE_CACHE", ".cache")
+CACHE_VERSION = 1
+
+MESH_SCHEMA = {
+    "UniProtID": pl.Utf8,
+    "Protein": pl.Utf8,
+    "Gene": pl.Utf8,
+    "MeSH_Heading": pl.Utf8,
+    "MeSH_UI": pl.Utf8,
+}
+SYNONYM_SCHEMA = {
+    "Protein": pl.Utf8,
+    "Synonym": pl.Utf8,
+}
+
+UNIPROT_PATTERN = r"^[A-Z0-9]{6,10}(_[A-Z0-9]{6,10})*$"   # Interleukin-27 is a heterodimer
+MESH_UI_PATTERN = r"^D\d{6,9}$"
+
+
+class ReferenceDataError(ValueError):
+    pass
+
+
+def clean_text(col):
+    # Tabs and repeated whitespace inside values, and surrounding whitespace
+    return pl.col(col).str.replace_all(r"\s+", " ").str.strip_chars()
+
+
+def check(df, condition, message, path):
+    bad = df.with_row_index("Row", offset=2).filter(~condition.fill_null(False))
+    if bad.height:
+        rows = ", ".join(str(r) for r in bad["Row"].head(10).to_list())
+        raise ReferenceDataError(f"{path}: {bad.height} rows {message} (file lines {rows})")
+
+
+def parse_protein_mesh(path):
+    # ';'-delimited: UniProtID;Protein name;Gene;MeSH heading;UI
+    raw = pl.read_csv(path, separator=";", infer_schema=False)
+    if raw.width != len(MESH_SCHEMA):
+        raise ReferenceDataError(f"{path}: expected {len(MESH_SCHEMA)} columns, found {raw.width}")
+    df = (
+        raw.rename(dict(zip(raw.columns, MESH_SCHEMA)))
+        .with_columns([clean_text(col) for col in MESH_SCHEMA])
+        .with_columns(pl.when(pl.col("MeSH_Heading") == "").then(None).otherwise(pl.col("MeSH_Heading"))
+                      .alias("MeSH_Heading"))
+        .cast(MESH_SCHEMA)
+    )
+    for col in ["UniProtID", "Protein", "Gene", "MeSH_UI"]:
+        check(df, pl.col(col).is_not_null() & (pl.col(col) != ""), f"have no {col}", path)
+    check(df, pl.col("UniProtID").str.contains(UNIPROT_PATTERN), "have a malformed UniProt ID", path)
+    check(df, pl.col("MeSH_UI").str.contains(MESH_UI_PATTERN), "have a malformed MeSH UI", path)
+    check(df, ~pl.col("Protein").is_duplicated(), "repeat a protein name", path)
+    return df
+
+
+def parse_protein_synonyms(path):
+    # Protein,Synonyms with the synonyms ';'-separated; returned long, one synonym per row
+    raw = pl.read_csv(path, infer_schema=False)
+    if raw.columns != ["Protein", "Synonyms"]:
+        raise ReferenceDataError(f"{path}: expected columns Protein,Synonyms, found {','.join(raw.columns)}")
+    df = raw.with_columns(clean_text("Protein"))
+    check(df, pl.col("Protein").is_not_null() & (pl.col("Protein") != ""), "have no protein name", path)
+    check(df, ~pl.col("Protein").is_duplicated(), "repeat a protein name", path)
+    check(df, pl.col("Synonyms").is_not_null(), "have no synonyms", path)
+    return (
+        df.with_columns(pl.col("Synonyms").str.split(";").alias("Synonym"))
+        .explode("Synonym")
+        .with_columns(clean_text("Synonym"))
+        .filter(pl.col("Synonym") != "")
+        .unique(["Protein", "Synonym"], maintain_order=True)
+        .select(list(SYNONYM_SCHEMA))
+        .cast(SYNONYM_SCHEMA)
+    )
+
+
+def cache_path(path):
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{CACHE_VERSION}"
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}-{hashlib.sha1(key.encode()).hexdigest()[:12]}.parquet"), stem
+
+
+def load_cached(path, parse):
+    # Several processes may start at once on a cold cache: each writes its own temp file and the
+    # last os.replace wins. The cache is only a speed-up, any failure falls back to the parsed table.
+    cached, stem = cache_path(path)
+    if os.path.exists(cached):
+        try:
+            return pl.read_parquet(cached)
+        except Exception:
+            pass
+
+    df = parse(path)
+    tmp = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, prefix=stem + "-", suffix=".tmp")
+        os.close(fd)
+        df.write_parquet(tmp)
+        os.replace(tmp, cached)
+        tmp = None
+        # Caches of older versions of the same file are stale
+        for name in os.listdir(CACHE_DIR):
+            stale = os.path.join(CACHE_DIR, name)
+            if name.startswith(stem + "-") and name.endswith(".parquet") and stale != cached:
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+    except OSError:
+        pass
+    finally:
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+    return df
+
+
+def load_protein_mesh(path="protein_mesh.csv"):
+    return load_cached(path, parse_protein_mesh)
+
+
+def load_protein_synonyms(path="protein_synonyms.csv"):
+    return load_cached(path, parse_protein_synonyms)
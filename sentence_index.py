@@ -0,0 +1,358 @@
+import os
+import json
+import zlib
+import shutil
+import hashlib
+import argparse
+import numpy as np
+import polars as pl
+from panel import load_panel
+
+# Semantic search over the extracted sentences. Sentences are embedded in batches (hashed TF-IDF
+# projected to a small dense space, or a local sentence-transformers model when one is given) and
+# stored in an on-disk inverted-file index: vectors are grouped by nearest k-means centroid, so a
+# query only scans the few lists closest to it. Every added input becomes a new segment of
+# mmap-able .npy files, which is how new baseline results are added without a rebuild. Rows are
+# keyed on (PubMedID, sentence), so re-adding a regenerated sentences.csv or a partition whose
+# sentences are already indexed only adds the sentences that are new. The IDF weights and centroids
+# come from the first input; `rebuild` retrains them on a sample of everything indexed since.
+
+INDEX_DIR = "sentence_index"
+input_file = "sentences.csv"
+
+BUCKETS = 2 ** 15       # hashed vocabulary size
+DIM = 256               # dense dimension of the hashed TF-IDF projection
+N_LISTS = 256           # k-means centroids (inverted lists)
+N_PROBE = 8             # lists scanned per query
+BATCH_SIZE = 2048
+TRAIN_SAMPLE = 100000
+SEED = 42
+TOKEN_PATTERN = r"[a-z0-9]+"
+
+
+class HashedTfidf:
+    name = "hashed-tfidf"
+
+    def __init__(self, idf=None):
+        rng = np.random.default_rng(SEED)
+        self.projection = (rng.standard_normal((BUCKETS, DIM)) / np.sqrt(DIM)).astype(np.float32)
+        self.idf = idf
+        self.dim = DIM
+
+    def _bucket_counts(self, texts):
+        # (row, bucket, count) for every distinct token of every text, in one polars pass
+        tokens = (
+            pl.DataFrame({"Text": texts}).with_row_index("Row")
+            .select(["Row", pl.col("Text").str.to_lowercase().str.extract_all(TOKEN_PATTERN).alias("Token")])
+            .explode("Token")
+            .drop_nulls("Token")
+            .group_by(["Row", "Token"]).agg(pl.len().alias("Count"))
+        )
+        vocab = tokens["Token"].unique()
+        buckets = pl.DataFrame({
+            "Token": vocab,
+            "Bucket": [zlib.crc32(t.encode("utf-8")) % BUCKETS for t in vocab.to_list()],
+        })
+        tokens = tokens.join(buckets, on="Token")
+        return (
+            tokens["Row"].to_numpy().astype(np.int64),
+            tokens["Bucket"].to_numpy().astype(np.int64),
+            tokens["Count"].to_numpy().astype(np.float32),
+        )
+
+    def fit(self, texts):
+        # Document frequency per hash bucket, frozen afterwards so later segments stay comparable
+        df = np.zeros(BUCKETS, dtype=np.float64)
+        for start in range(0, len(texts), BATCH_SIZE):
+            rows, buckets, _ = self._bucket_counts(texts[start:start + BATCH_SIZE])
+            pairs = np.unique(rows * BUCKETS + buckets)
+            np.add.at(df, pairs % BUCKETS, 1)
+        self.idf = (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+
+    def embed(self, texts):
+        out = np.zeros((len(texts), DIM), dtype=np.float32)
+        if not texts:
+            return out
+        rows, buckets, counts = self._bucket_counts(texts)
+        weights = (1 + np.log(counts)) * self.idf[buckets]
+        np.add.at(out, rows, weights[:, None] * self.projection[buckets])
+        return normalize(out)
+
+
+class SentenceTransformerEmbedder:
+    def __init__(self, model_name):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise SystemExit("sentence-transformers is not installed, drop --model to use hashed TF-IDF")
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def fit(self, texts):
+        pass
+
+    def embed(self, texts):
+        vectors = self.model.encode(texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+        return vectors.astype(np.float32)
+
+
+def normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def embed_batches(embedder, texts):
+    return np.vstack([embedder.embed(texts[i:i + BATCH_SIZE]) for i in range(0, len(texts), BATCH_SIZE)]
+                     or [np.zeros((0, embedder.dim), dtype=np.float32)])
+
+
+def train_centroids(vectors, n_lists, iterations=10):
+    # Spherical k-means on a sample of the vectors
+    rng = np.random.default_rng(SEED)
+    sample = vectors[rng.permutation(len(vectors))[:TRAIN_SAMPLE]]
+    n_lists = min(n_lists, len(sample))
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = assign_lists(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        empty = np.bincount(assign, minlength=n_lists) == 0
+        sums[empty] = centroids[empty]
+        centroids = normalize(sums)
+    return centroids
+
+
+def assign_lists(vectors, centroids):
+    return np.concatenate([
+        np.argmax(vectors[i:i + BATCH_SIZE] @ centroids.T, axis=1)
+        for i in range(0, len(vectors), BATCH_SIZE)
+    ]) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+
+# === Index files ===
+
+def manifest_path(index_dir):
+    return os.path.join(index_dir, "manifest.json")
+
+
+def load_manifest(index_dir):
+    path = manifest_path(index_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(index_dir, manifest):
+    # The manifest is replaced atomically, segments only count once it lists them
+    tmp = manifest_path(index_dir) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, manifest_path(index_dir))
+
+
+def load_embedder(index_dir, manifest):
+    if manifest["embedder"] == HashedTfidf.name:
+        return HashedTfidf(np.load(os.path.join(index_dir, "idf.npy")))
+    return SentenceTransformerEmbedder(manifest["embedder"])
+
+
+def sentence_key(pmid, sentence):
+    # Stable across runs and polars versions, unlike pl.Expr.hash
+    digest = hashlib.blake2b(f"{pmid}\t{sentence}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") >> 1   # fits Int64
+
+
+def indexed_keys(index_dir, manifest):
+    if not manifest or not manifest["segments"]:
+        return pl.DataFrame({"Sentence_Key": []}, schema={"Sentence_Key": pl.Int64})
+    paths = [os.path.join(index_dir, f"{seg['name']}.parquet") for seg in manifest["segments"]]
+    return pl.scan_parquet(paths).select("Sentence_Key").collect()
+
+
+def read_sentences(path):
+    # Accepts split.py output (one sentence per row) or extract_v4 partitions ("||"-joined sentences)
+    df = pl.read_csv(path, schema_overrides={"Protein_Codes": pl.Utf8})
+    if "Protein_Codes" in df.columns:
+        panel = load_panel()
+        df = df.with_columns(
+            pl.col("Protein_Codes").map_elements(lambda c: "; ".join(sorted(panel.decode(c))), return_dtype=pl.Utf8)
+            .alias("Matched_Proteins")
+        )
+    if "Relevant_Sentence" not in df.columns:
+        df = (
+            df.with_columns(pl.col("Relevant_Sentences").str.split("||").alias("Relevant_Sentence"))
+            .explode("Relevant_Sentence")
+        )
+    df = (
+        df.select(["PubMedID", "Matched_Proteins", pl.col("Relevant_Sentence").str.strip_chars()])
+        .filter(pl.col("Relevant_Sentence").is_not_null() & (pl.col("Relevant_Sentence") != ""))
+    )
+    keys = [sentence_key(p, s) for p, s in df.select(["PubMedID", "Relevant_Sentence"]).iter_rows()]
+    return (
+        df.with_columns(pl.Series("Sentence_Key", keys, dtype=pl.Int64))
+        .unique("Sentence_Key", keep="first", maintain_order=True)
+    )
+
+
+def train(index_dir, embedder, texts, n_lists):
+    # IDF weights and centroids, frozen until the next rebuild
+    if len(texts) < TRAIN_SAMPLE:
+        print(f"⚠️ Training on {len(texts)} sentences (fewer than {TRAIN_SAMPLE}), "
+              f"run `sentence_index.py rebuild` once more sentences are indexed")
+    embedder.fit(texts)
+    if isinstance(embedder, HashedTfidf):
+        np.save(os.path.join(index_dir, "idf.npy"), embedder.idf)
+    vectors = embed_batches(embedder, texts)
+    centroids = train_centroids(vectors, n_lists)
+    np.save(os.path.join(index_dir, "centroids.npy"), centroids)
+    return vectors, centroids
+
+
+def create_index(index_dir, sentences, model=None, n_lists=N_LISTS):
+    os.makedirs(index_dir, exist_ok=True)
+    embedder = SentenceTransformerEmbedder(model) if model else HashedTfidf()
+    vectors, centroids = train(index_dir, embedder, sentences["Relevant_Sentence"].to_list(), n_lists)
+    manifest = {"embedder": embedder.name, "dim": embedder.dim, "n_lists": len(centroids), "segments": []}
+    return manifest, embedder, vectors
+
+
+def add_segment(index_dir, manifest, sentences, vectors, source):
+    centroids = np.load(os.path.join(index_dir, "centroids.npy"))
+    assign = assign_lists(vectors, centroids)
+    order = np.argsort(assign, kind="stable")
+    offsets = np.searchsorted(assign[order], np.arange(len(centroids) + 1))
+
+    name = f"seg_{len(manifest['segments']):05d}"
+    np.save(os.path.join(index_dir, f"{name}.vectors.npy"), vectors[order].astype(np.float16))
+    np.save(os.path.join(index_dir, f"{name}.offsets.npy"), offsets.astype(np.int64))
+    sentences[order.tolist()].write_parquet(os.path.join(index_dir, f"{name}.parquet"))
+
+    manifest["segments"].append({"name": name, "source": source, "rows": len(order)})
+    save_manifest(index_dir, manifest)
+    return name
+
+
+def add_files(index_dir, paths, model=None):
+    manifest = load_manifest(index_dir)
+    embedder = load_embedder(index_dir, manifest) if manifest else None
+    known = indexed_keys(index_dir, manifest)
+
+    for path in paths:
+        source = os.path.basename(path)
+        sentences = read_sentences(path).join(known, on="Sentence_Key", how="anti")
+        if sentences.is_empty():
+            print(f"Skipping {source}, no new sentences")
+            continue
+        if manifest is None:
+            # The first input also trains the IDF weights and the centroids, until the next rebuild
+            manifest, embedder, vectors = create_index(index_dir, sentences, model)
+        else:
+            vectors = embed_batches(embedder, sentences["Relevant_Sentence"].to_list())
+        name = add_segment(index_dir, manifest, sentences, vectors, source)
+        known = pl.concat([known, sentences.select("Sentence_Key")])
+        print(f"✅ {source}: {len(sentences)} sentences indexed as {name}")
+
+
+def rebuild_index(index_dir, n_lists=N_LISTS):
+    # Retrain on a sample of every segment and re-assign all of them. The new index is built next to
+    # the old one and swapped in, so a failed rebuild leaves the index as it was
+    manifest = load_manifest(index_dir)
+    if not manifest or not manifest["segments"]:
+        raise SystemExit(f"No index to rebuild in {index_dir}")
+    paths = [os.path.join(index_dir, f"{seg['name']}.parquet") for seg in manifest["segments"]]
+    total = sum(seg["rows"] for seg in manifest["segments"])
+    picked = np.random.default_rng(SEED).choice(total, min(total, TRAIN_SAMPLE), replace=False)
+    sample = (
+        pl.scan_parquet(paths).select("Relevant_Sentence").with_row_index("Row")
+        .filter(pl.col("Row").is_in(picked.tolist()))
+        .collect()["Relevant_Sentence"].to_list()
+    )
+
+    base = os.path.normpath(index_dir)
+    new_dir, old_dir = base + ".rebuild", base + ".old"
+    shutil.rmtree(new_dir, ignore_errors=True)
+    os.makedirs(new_dir)
+    hashed = manifest["embedder"] == HashedTfidf.name
+    embedder = HashedTfidf() if hashed else load_embedder(index_dir, manifest)
+    _, centroids = train(new_dir, embedder, sample, n_lists)
+    rebuilt = {"embedder": embedder.name, "dim": embedder.dim, "n_lists": len(centroids), "segments": []}
+
+    for seg in manifest["segments"]:
+        sentences = pl.read_parquet(os.path.join(index_dir, f"{seg['name']}.parquet"))
+        if hashed:
+            vectors = embed_batches(embedder, sentences["Relevant_Sentence"].to_list())
+        else:
+            # Model embeddings do not depend on the training sample, the stored rows line up with the parquet
+            vectors = np.load(os.path.join(index_dir, f"{seg['name']}.vectors.npy")).astype(np.float32)
+        add_segment(new_dir, rebuilt, sentences, vectors, seg["source"])
+
+    shutil.rmtree(old_dir, ignore_errors=True)
+    os.replace(base, old_dir)
+    os.replace(new_dir, base)
+    shutil.rmtree(old_dir)
+    print(f"✅ Rebuilt {len(rebuilt['segments'])} segments ({total} sentences) on {len(sample)} training sentences")
+
+
+def open_index(index_dir):
+    # Load once and reuse for many queries; segment vectors stay memory-mapped
+    manifest = load_manifest(index_dir)
+    return {
+        "dir": index_dir,
+        "embedder": load_embedder(index_dir, manifest),
+        "centroids": np.load(os.path.join(index_dir, "centroids.npy")),
+        "segments": [
+            (
+                seg["name"],
+                np.load(os.path.join(index_dir, f"{seg['name']}.vectors.npy"), mmap_mode="r"),
+                np.load(os.path.join(index_dir, f"{seg['name']}.offsets.npy")),
+            )
+            for seg in manifest["segments"]
+        ],
+    }
+
+
+def search(index, query, k=10, n_probe=N_PROBE):
+    q = index["embedder"].embed([query])[0]
+    lists = np.argsort(index["centroids"] @ q)[::-1][:n_probe]
+
+    candidates = []
+    for name, vectors, offsets in index["segments"]:
+        for lst in lists:
+            start, end = offsets[lst], offsets[lst + 1]
+            if start == end:
+                continue
+            scores = np.asarray(vectors[start:end], dtype=np.float32) @ q
+            top = np.argsort(scores)[::-1][:k]
+            candidates.extend((float(scores[i]), name, int(start + i)) for i in top)
+
+    rows = []
+    for score, name, row in sorted(candidates, reverse=True)[:k]:
+        meta = pl.scan_parquet(os.path.join(index["dir"], f"{name}.parquet")).slice(row, 1).collect()
+        rows.append({"Score": score, **meta.drop("Sentence_Key").row(0, named=True)})
+    return pl.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embedding index over the extracted sentences")
+    parser.add_argument("--index", default=INDEX_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="index new sentence files (creates the index on first use)")
+    add.add_argument("inputs", nargs="*", default=[input_file])
+    add.add_argument("--model", default=None, help="local sentence-transformers model (default: hashed TF-IDF)")
+    sub.add_parser("rebuild", help="retrain the IDF weights and centroids on all indexed sentences")
+    query = sub.add_parser("search", help="sentences most similar to a statement")
+    query.add_argument("query")
+    query.add_argument("-k", type=int, default=10)
+    query.add_argument("--probe", type=int, default=N_PROBE)
+    args = parser.parse_args()
+
+    if args.command == "add":
+        add_files(args.index, args.inputs, args.model)
+    elif args.command == "rebuild":
+        rebuild_index(args.index)
+    else:
+        with pl.Config(fmt_str_lengths=120, tbl_rows=args.k):
+            print(search(open_index(args.index), args.query, args.k, args.probe))
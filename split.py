@@ -2,20 +2,27 @@ import polars as pl
 
 df = pl.read_csv("Result-v4\\all_results_concatenated.csv")
 
+# Normalized sentences and their offsets (written by extract_v4) are split alongside the originals
+parallel_cols = {
+    "Relevant_Sentences": "Relevant_Sentence",
+    "Normalized_Sentences": "Normalized_Sentence",
+    "Sentence_Offsets": "Sentence_Offsets",
+}
+parallel_cols = {col: name for col, name in parallel_cols.items() if col in df.columns}
+
 #Split 'Relevant_Sentences' into lists
-df = df.with_columns(
-    pl.col("Relevant_Sentences")
-    .str.split("||")
-    .alias("Split_Sentences")
-)
+df = df.with_columns([
+    pl.col(col).str.split("||").alias(name)
+    for col, name in parallel_cols.items()
+])
 
-#Explode the list so each sentence becomes its own row
+#Explode the lists together so each sentence becomes its own row
 sentences_df = (
-    df.explode("Split_Sentences")
+    df.explode(list(parallel_cols.values()))
     .select([
         pl.col("PubMedID"),
         pl.col("Matched_Proteins"),
-        pl.col("Split_Sentences").str.strip_chars().alias("Relevant_Sentence")
+        *[pl.col(name).str.strip_chars() for name in parallel_cols.values()]
     ]).filter(pl.col("Relevant_Sentence") != "")
 )
 
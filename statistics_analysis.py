@@ -1,25 +1,30 @@
+import os
 import polars as pl
 import re
+import tempfile
+import random
+import argparse
+import multiprocessing
+from collections import Counter
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from text_normalization import normalize_text
+from panel import load_panel
+from progress import Progress, reporter, init_worker as init_progress
 
-syn_file = "protein_synonyms.csv"        
-pubmed_files = "Result-v4\\all_results_cleaned.csv"      
+pubmed_files = "Result-v4\\all_results_cleaned.csv"
 output_file = "synonym_pubmed_frequencies.csv"
 EXAMPLES_FILE = "synonym_examples.csv"
+PROTEIN_COUNTS_FILE = "protein_pubmed_counts.csv"
+
+MAX_EXAMPLES = 3
+CHUNK_ROWS = 20000
+SEED = 0
 
-syn_df = pl.read_csv(syn_file)
-pub_df = pl.read_csv(pubmed_files)
-texts = pub_df["Relevant_Sentences"].to_list()
-
-syn_exploded = (
-    syn_df.with_columns(
-        pl.col("Synonyms").str.split(";").alias("Syn_List")
-    )
-    .explode("Syn_List")
-    .with_columns(pl.col("Syn_List").str.strip_chars().alias("Synonym"))
-    .drop_nulls("Synonym")
-    .select(["Protein", "Synonym"])
-    .unique()
-)
+
+def load_synonyms():
+    panel = load_panel()
+    return [(name, syn) for name, syns in zip(panel.names, panel.synonyms) for syn in syns]
 
 # build safe regex
 def make_pattern(syn: str) -> re.Pattern:
@@ -28,43 +33,173 @@ def make_pattern(syn: str) -> re.Pattern:
     pattern = rf"(?<!\w){esc}(?!\w)"
     return re.compile(pattern, flags=re.IGNORECASE)
 
-# Count matches
-rows = []
-examples = []
-MAX_EXAMPLES = 3
 
-for rec in syn_exploded.iter_rows(named=True):
-    protein = rec["Protein"]
-    synonym = rec["Synonym"]
-    if not synonym or synonym.strip() == "":
-        continue
-    pat = make_pattern(synonym)
-    total = 0
-    sample_sentences = []
-
-    for t in texts:
-        if not t:
-            continue
-        matches = pat.findall(str(t))
-        if matches:
-            total += len(matches)
-            if len(sample_sentences) < MAX_EXAMPLES:
-                sample_sentences.append(t)
-
-    rows.append((protein, synonym, total))
-    for s in sample_sentences:
-        examples.append((protein, synonym, s))
-
-# Convert to Polars DataFrames 
-results = pl.DataFrame(rows, schema=["Protein", "Synonym", "Mentions"], orient="row")
-results = results.sort("Mentions", descending=True)
-
-examples_df = pl.DataFrame(examples, schema=["Protein", "Synonym", "Example_Sentence"], orient="row")
-
-results.write_csv(output_file)
-examples_df.write_csv(EXAMPLES_FILE)
-
-print(f"Done. Saved counts to: {output_file}")
-print(f"Example sentences saved to: {EXAMPLES_FILE}")
-print("\nTop 10 synonyms by mention count:")
-print(results.head(10))
+def make_needle(syn: str):
+    # Any hit of the pattern leaves this substring in the normalized sentence, so rows without it
+    # are skipped before the regex runs. Only used for ASCII synonyms, where that is guaranteed.
+    needle = normalize_text(syn)
+    return needle if needle.isascii() else None
+
+
+# Patterns are compiled once per worker process
+_patterns = None
+
+def init_worker(synonyms, progress_queue=None):
+    global _patterns
+    init_progress(progress_queue)
+    _patterns = [(protein, synonym, make_pattern(synonym), make_needle(synonym)) for protein, synonym in synonyms]
+
+
+def reservoir_add(reservoir, seen, item, rng):
+    # Classic reservoir sampling: keep each of the `seen` items with probability MAX_EXAMPLES / seen
+    if len(reservoir) < MAX_EXAMPLES:
+        reservoir.append(item)
+    else:
+        j = rng.randrange(seen)
+        if j < MAX_EXAMPLES:
+            reservoir[j] = item
+
+
+def reservoir_merge(a, seen_a, b, seen_b, rng):
+    # Draw from each reservoir in proportion to the number of items it stands for
+    a, b = list(a), list(b)
+    merged = []
+    while len(merged) < MAX_EXAMPLES and (a or b):
+        if a and (not b or rng.randrange(seen_a + seen_b) < seen_a):
+            merged.append(a.pop(rng.randrange(len(a))))
+            seen_a -= 1
+        else:
+            merged.append(b.pop(rng.randrange(len(b))))
+            seen_b -= 1
+    return merged
+
+
+def stage_parquet(path, chunk_rows, folder):
+    # One streaming pass over the CSV into Parquet with a row group per chunk, so a worker reads
+    # its slice from the row-group metadata instead of re-scanning the CSV up to its offset
+    lf = pl.scan_csv(path)
+    columns = ["PubMedID", "Matched_Proteins", "Relevant_Sentences"]
+    if "Normalized_Sentences" in lf.collect_schema().names():
+        columns.append("Normalized_Sentences")
+    staged = os.path.join(folder, "chunks.parquet")
+    lf.select(columns).sink_parquet(staged, row_group_size=chunk_rows)
+    return staged
+
+
+def process_chunk(path, offset, length):
+    # Partial counters for one slice of the staged results
+    rng = random.Random(SEED + offset)
+    reporter().begin(f"rows {offset}-{offset + length}")
+    chunk = pl.scan_parquet(path).slice(offset, length).collect()
+    # Normalized text stored at extraction pre-filters the rows, rows that lack it are normalized here
+    normalized = (chunk["Normalized_Sentences"].to_list() if "Normalized_Sentences" in chunk.columns
+                  else [None] * chunk.height)
+    texts = [
+        (str(t), n if n else normalize_text(str(t)))
+        for t, n in zip(chunk["Relevant_Sentences"].to_list(), normalized) if t
+    ]
+
+    mentions = Counter()
+    examples = {}
+    for protein, synonym, pat, needle in _patterns:
+        key = (protein, synonym)
+        reservoir = []
+        seen = 0
+        for t, norm in texts:
+            if needle and needle not in norm:
+                continue
+            matches = pat.findall(t)
+            if matches:
+                mentions[key] += len(matches)
+                seen += 1
+                reservoir_add(reservoir, seen, t, rng)
+        if seen:
+            examples[key] = (reservoir, seen)
+
+    pmids = {}
+    for pmid, proteins in chunk.select(["PubMedID", "Matched_Proteins"]).drop_nulls().iter_rows():
+        for protein in str(proteins).split(";"):
+            pmids.setdefault(protein.strip(), set()).add(pmid)
+
+    reporter().add(articles=chunk.height)
+    # No bytes: the in-memory size is not input read, and the ETA already counts chunks
+    reporter().end()
+    return mentions, examples, pmids
+
+
+def merge_partials(partials):
+    rng = random.Random(SEED)
+    mentions = Counter()
+    examples = {}
+    pmids = {}
+    for part_mentions, part_examples, part_pmids in partials:
+        mentions.update(part_mentions)
+        for key, (reservoir, seen) in part_examples.items():
+            if key in examples:
+                old, old_seen = examples[key]
+                examples[key] = (reservoir_merge(old, old_seen, reservoir, seen, rng), old_seen + seen)
+            else:
+                examples[key] = (reservoir, seen)
+        for protein, ids in part_pmids.items():
+            pmids.setdefault(protein, set()).update(ids)
+    return mentions, examples, pmids
+
+
+def run(path, synonyms, chunk_rows=CHUNK_ROWS, max_workers=None):
+    # Staged next to the working directory, /tmp is often a small RAM disk
+    with tempfile.TemporaryDirectory(dir=".") as folder:
+        staged = stage_parquet(path, chunk_rows, folder)
+        n_rows = pl.scan_parquet(staged).select(pl.len()).collect().item()
+        offsets = list(range(0, n_rows, chunk_rows))
+        print(f"Processing {n_rows} rows in {len(offsets)} chunks of {chunk_rows}")
+
+        # polars' thread pool does not survive fork(), so workers are spawned
+        ctx = multiprocessing.get_context("spawn")
+        progress = Progress("statistics_analysis", total_items=len(offsets), unit="chunks", mp_context=ctx).start()
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx,
+                                     initializer=init_worker, initargs=(synonyms, progress.queue)) as executor:
+                # Partials are merged as they arrive so only the running totals stay in memory
+                partials = executor.map(process_chunk, repeat(staged), offsets, repeat(chunk_rows))
+                return merge_partials(partials)
+        finally:
+            progress.close()
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Synonym mention frequencies over the cleaned results")
+    parser.add_argument("--input", default=pubmed_files)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    synonyms = load_synonyms()
+    mentions, examples, pmids = run(args.input, synonyms, args.chunk_rows, args.workers)
+
+    # Convert to Polars DataFrames
+    rows = [(protein, synonym, mentions.get((protein, synonym), 0)) for protein, synonym in synonyms]
+    results = pl.DataFrame(rows, schema=["Protein", "Synonym", "Mentions"], orient="row")
+    results = results.sort("Mentions", descending=True)
+
+    example_rows = [
+        (protein, synonym, s)
+        for protein, synonym in synonyms
+        for s in examples.get((protein, synonym), ([], 0))[0]
+    ]
+    examples_df = pl.DataFrame(example_rows, schema=["Protein", "Synonym", "Example_Sentence"], orient="row")
+
+    protein_counts = pl.DataFrame(
+        [(protein, len(ids)) for protein, ids in pmids.items()],
+        schema=["Protein", "PubMed_Articles"], orient="row",
+    ).sort("PubMed_Articles", descending=True)
+
+    results.write_csv(output_file)
+    examples_df.write_csv(EXAMPLES_FILE)
+    protein_counts.write_csv(PROTEIN_COUNTS_FILE)
+
+    print(f"Done. Saved counts to: {output_file}")
+    print(f"Example sentences saved to: {EXAMPLES_FILE}")
+    print(f"PubMed articles per protein saved to: {PROTEIN_COUNTS_FILE}")
+    print("\nTop 10 synonyms by mention count:")
+    print(results.head(10))
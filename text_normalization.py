@@ -0,0 +1,79 @@
+import re
+from bisect import bisect_right
+
+# Normalized text (lowercase, hyphens/whitespace removed) together with a mapping back to the
+# original sentence. The mapping is stored as runs "norm_start:orig_start": every run of
+# normalized characters starting at norm_start comes from consecutive original characters
+# starting at orig_start.
+
+SENTENCE_SEPARATOR = " || "
+_kept = re.compile(r"[^-\s]+")
+_truncated = re.compile(r"\(ABSTRACT TRUNCATED(?: AT \d+ WORDS)?\)")
+
+
+def clean_sentence(sent):
+    # The same cleanup data_cleaning.py applies, done once before offsets are computed
+    sent = _truncated.sub("", sent)
+    return re.sub(r"\s{2,}", " ", sent).strip()
+
+
+def normalize_with_offsets(text):
+    parts = []
+    runs = []
+    pos = 0
+    for m in _kept.finditer(text):
+        seg = m.group()
+        low = seg.lower()
+        if len(low) == len(seg):
+            runs.append((pos, m.start()))
+        else:
+            # Rare characters lowercase to several characters (e.g. "İ"), map each one separately
+            low = ""
+            for i, ch in enumerate(seg):
+                for c in ch.lower():
+                    runs.append((pos + len(low), m.start() + i))
+                    low += c
+        parts.append(low)
+        pos += len(low)
+    return "".join(parts), runs
+
+
+def normalize_text(text):
+    return normalize_with_offsets(text)[0]
+
+
+def encode_offsets(runs):
+    return ",".join(f"{n}:{o}" for n, o in runs)
+
+
+def decode_offsets(encoded):
+    if not encoded:
+        return []
+    return [tuple(int(x) for x in run.split(":")) for run in encoded.split(",")]
+
+
+def to_original_span(runs, start, end):
+    # Map a normalized span [start, end) to the span of the original sentence that produced it
+    def orig(pos):
+        n, o = runs[bisect_right(runs, (pos, float("inf"))) - 1]
+        return o + pos - n
+    return orig(start), orig(end - 1) + 1
+
+
+def find_spans(normalized, runs, term):
+    # Original-sentence spans of every whole-word hit of a normalized term
+    pattern = re.compile(rf"\b{re.escape(term)}\b")
+    return [to_original_span(runs, m.start(), m.end()) for m in pattern.finditer(normalized)]
+
+
+def highlight(sentence, spans, left="**", right="**"):
+    out = []
+    last = 0
+    for start, end in sorted(spans):
+        if start < last:
+            continue  # overlapping hit already highlighted
+        out.append(sentence[last:start])
+        out.append(left + sentence[start:end] + right)
+        last = end
+    out.append(sentence[last:])
+    return "".join(out)